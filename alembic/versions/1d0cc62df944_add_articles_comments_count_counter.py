@@ -0,0 +1,44 @@
+"""Add articles comments_count counter.
+
+Revision ID: 1d0cc62df944
+Revises: a09d8d450be7
+Create Date: 2026-10-18 20:50:21.419410
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "1d0cc62df944"
+down_revision: Union[str, None] = "a09d8d450be7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "articles",
+        sa.Column("comments_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # backfill from existing comments
+    op.execute(
+        """
+        UPDATE articles a
+        SET comments_count = c.comments_count
+        FROM (
+            SELECT article_id, COUNT(*) AS comments_count
+            FROM article_comments
+            GROUP BY article_id
+        ) c
+        WHERE c.article_id = a.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("articles", "comments_count")
@@ -0,0 +1,32 @@
+"""Add users feed_pulled flag.
+
+Revision ID: 334165b77c70
+Revises: 1d0cc62df944
+Create Date: 2026-10-18 21:08:56.569975
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "334165b77c70"
+down_revision: Union[str, None] = "1d0cc62df944"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # authors currently at or above the fan-out limit are pulled by their
+    # followers_count, the flag only keeps them pulled once they drop below it
+    op.add_column(
+        "users",
+        sa.Column("feed_pulled", sa.Boolean(), nullable=False, server_default="false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "feed_pulled")
@@ -0,0 +1,44 @@
+"""Add users followers_count counter.
+
+Revision ID: 9b97b34d6615
+Revises: cf4d224ff8a5
+Create Date: 2026-10-18 20:13:52.832586
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b97b34d6615"
+down_revision: Union[str, None] = "cf4d224ff8a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("followers_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # backfill from existing follows
+    op.execute(
+        """
+        UPDATE users u
+        SET followers_count = uf.followers_count
+        FROM (
+            SELECT following_user_id, COUNT(*) AS followers_count
+            FROM user_follows
+            GROUP BY following_user_id
+        ) uf
+        WHERE uf.following_user_id = u.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "followers_count")
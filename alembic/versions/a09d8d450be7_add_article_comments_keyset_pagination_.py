@@ -0,0 +1,43 @@
+"""Add article comments keyset pagination index.
+
+Revision ID: a09d8d450be7
+Revises: dd1c9ad8fa24
+Create Date: 2026-10-18 20:44:42.220545
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a09d8d450be7"
+down_revision: Union[str, None] = "dd1c9ad8fa24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # comment pages are read in (created_date, id) order after a cursor, the id
+    # breaks ties so the index alone serves both the order and the seek
+    op.create_index(
+        "ix_article_comments_article_id_created_date_id",
+        "article_comments",
+        ["article_id", "created_date", "id"],
+    )
+    op.drop_index(
+        "ix_article_comments_article_id_created_date", table_name="article_comments"
+    )
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_article_comments_article_id_created_date",
+        "article_comments",
+        ["article_id", "created_date"],
+    )
+    op.drop_index(
+        "ix_article_comments_article_id_created_date_id",
+        table_name="article_comments",
+    )
@@ -0,0 +1,44 @@
+"""Add articles favorites_count counter.
+
+Revision ID: bbb8f8850854
+Revises: aaddef142d08
+Create Date: 2026-10-18 20:02:24.611093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "bbb8f8850854"
+down_revision: Union[str, None] = "aaddef142d08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "articles",
+        sa.Column("favorites_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # backfill from existing favorites
+    op.execute(
+        """
+        UPDATE articles a
+        SET favorites_count = f.favorites_count
+        FROM (
+            SELECT article_id, COUNT(*) AS favorites_count
+            FROM article_favorites
+            GROUP BY article_id
+        ) f
+        WHERE f.article_id = a.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("articles", "favorites_count")
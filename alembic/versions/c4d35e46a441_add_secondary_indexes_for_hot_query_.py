@@ -0,0 +1,124 @@
+"""Add secondary indexes for hot query paths.
+
+Revision ID: c4d35e46a441
+Revises: 9b97b34d6615
+Create Date: 2026-10-18 20:15:44.815312
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d35e46a441"
+down_revision: Union[str, None] = "9b97b34d6615"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_email_case_duplicates() -> None:
+    # ux_users_email_lower cannot be built while emails differ only by case,
+    # those accounts have to be merged or their emails changed by hand first
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                """
+                SELECT lower(email) AS email, string_agg(email, ', ') AS variants
+                FROM users
+                GROUP BY lower(email)
+                HAVING COUNT(*) > 1
+                ORDER BY lower(email)
+                """
+            )
+        )
+        .fetchall()
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot create ux_users_email_lower, emails differ only by case: "
+            + "; ".join(row.variants for row in duplicates)
+        )
+
+
+def upgrade() -> None:
+    _check_email_case_duplicates()
+
+    # built without locking writes out of the tables, which CONCURRENTLY
+    # cannot do inside the migration transaction
+    with op.get_context().autocommit_block():
+        # global list and keyset pages: ORDER BY created_date DESC, id DESC
+        op.create_index(
+            "ix_articles_created_date",
+            "articles",
+            [sa.text("created_date DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        # author filter and pulled authors in the feed merge
+        op.create_index(
+            "ix_articles_author_user_id_created_date",
+            "articles",
+            ["author_user_id", sa.text("created_date DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+
+        # the (tag_id, article_id) primary key already serves the tag filter,
+        # tag hydration looks tags up by article instead
+        op.create_index(
+            "ix_article_tags_article_id_tag_id",
+            "article_tags",
+            ["article_id", "tag_id"],
+            postgresql_concurrently=True,
+        )
+
+        # the (article_id, user_id) primary key already serves lookups by
+        # article, the favorited filter and viewer flags look favorites up by user
+        op.create_index(
+            "ix_article_favorites_user_id_article_id",
+            "article_favorites",
+            ["user_id", "article_id"],
+            postgresql_concurrently=True,
+        )
+
+        # fan-out on write and follower counts look follows up by followed user
+        op.create_index(
+            "ix_user_follows_following_user_id_user_id",
+            "user_follows",
+            ["following_user_id", "user_id"],
+            postgresql_concurrently=True,
+        )
+
+        op.create_index(
+            "ix_article_comments_article_id_created_date",
+            "article_comments",
+            ["article_id", "created_date"],
+            postgresql_concurrently=True,
+        )
+
+        # case-insensitive login lookups in validate_user_creds
+        op.create_index(
+            "ux_users_email_lower",
+            "users",
+            [sa.text("lower(email)")],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, table_name in (
+            ("ux_users_email_lower", "users"),
+            ("ix_article_comments_article_id_created_date", "article_comments"),
+            ("ix_user_follows_following_user_id_user_id", "user_follows"),
+            ("ix_article_favorites_user_id_article_id", "article_favorites"),
+            ("ix_article_tags_article_id_tag_id", "article_tags"),
+            ("ix_articles_author_user_id_created_date", "articles"),
+            ("ix_articles_created_date", "articles"),
+        ):
+            op.drop_index(
+                index_name, table_name=table_name, postgresql_concurrently=True
+            )
@@ -0,0 +1,59 @@
+"""Add user_feed_items timeline table.
+
+Revision ID: cf4d224ff8a5
+Revises: bbb8f8850854
+Create Date: 2026-10-18 20:05:08.959219
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.dialects import postgresql
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "cf4d224ff8a5"
+down_revision: Union[str, None] = "bbb8f8850854"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # fan-out-on-write timeline, one row per (follower, followed author's article)
+    op.create_table(
+        "user_feed_items",
+        sa.Column("user_id", postgresql.UUID(), nullable=False),
+        sa.Column("article_id", postgresql.UUID(), nullable=False),
+        sa.Column("author_user_id", postgresql.UUID(), nullable=False),
+        sa.Column("created_date", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["article_id"], ["articles.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["author_user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "article_id"),
+    )
+    op.create_index(
+        "ix_user_feed_items_user_id_created_date",
+        "user_feed_items",
+        ["user_id", sa.text("created_date DESC"), sa.text("article_id DESC")],
+    )
+    op.create_index(
+        "ix_user_feed_items_user_id_author_user_id",
+        "user_feed_items",
+        ["user_id", "author_user_id"],
+    )
+
+    # backfill timelines from existing follows
+    op.execute(
+        """
+        INSERT INTO user_feed_items (user_id, article_id, author_user_id, created_date)
+        SELECT uf.user_id, a.id, a.author_user_id, a.created_date
+        FROM user_follows uf
+        JOIN articles a ON a.author_user_id = uf.following_user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_feed_items")
@@ -0,0 +1,50 @@
+"""Add articles full-text search vector.
+
+Revision ID: dd1c9ad8fa24
+Revises: e091ec05a00c
+Create Date: 2026-10-18 20:19:02.780403
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.dialects import postgresql
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "dd1c9ad8fa24"
+down_revision: Union[str, None] = "e091ec05a00c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # title outranks description, which outranks body
+    op.add_column(
+        "articles",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                """
+                setweight(to_tsvector('english', coalesce(title, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+                || setweight(to_tsvector('english', coalesce(body, '')), 'C')
+                """,
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index(
+        "ix_articles_search_vector",
+        "articles",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_articles_search_vector", table_name="articles")
+    op.drop_column("articles", "search_vector")
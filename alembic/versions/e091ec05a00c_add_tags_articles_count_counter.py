@@ -0,0 +1,52 @@
+"""Add tags articles_count counter.
+
+Revision ID: e091ec05a00c
+Revises: c4d35e46a441
+Create Date: 2026-10-18 20:17:03.930611
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e091ec05a00c"
+down_revision: Union[str, None] = "c4d35e46a441"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tags",
+        sa.Column("articles_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # backfill from existing article tags
+    op.execute(
+        """
+        UPDATE tags t
+        SET articles_count = at.articles_count
+        FROM (
+            SELECT tag_id, COUNT(*) AS articles_count
+            FROM article_tags
+            GROUP BY tag_id
+        ) at
+        WHERE at.tag_id = t.id
+        """
+    )
+
+    # GET /api/tags pages over the most popular tags
+    op.create_index(
+        "ix_tags_articles_count_name",
+        "tags",
+        [sa.text("articles_count DESC"), "name"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tags_articles_count_name", table_name="tags")
+    op.drop_column("tags", "articles_count")
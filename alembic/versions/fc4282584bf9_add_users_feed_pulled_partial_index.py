@@ -0,0 +1,52 @@
+"""Add users feed_pulled partial index.
+
+Revision ID: fc4282584bf9
+Revises: 334165b77c70
+Create Date: 2026-10-18 21:41:22.608707
+
+"""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "fc4282584bf9"
+down_revision: Union[str, None] = "334165b77c70"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the flag alone now marks pulled authors, so authors already at or above
+    # the fan-out limit are marked here, as their next follow would mark them
+    op.execute(
+        sa.text(
+            """
+            UPDATE users
+            SET feed_pulled = true
+            WHERE NOT feed_pulled
+            AND followers_count >= :fanout_limit
+            """
+        ).bindparams(fanout_limit=int(os.getenv("FEED_FANOUT_FOLLOWER_LIMIT", "10000")))
+    )
+
+    # pulled authors are few, the index holds only them
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_feed_pulled",
+            "users",
+            ["id"],
+            postgresql_where=sa.text("feed_pulled"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_feed_pulled", table_name="users", postgresql_concurrently=True
+        )
@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import threading
+import typing as typ
+from logging import Logger
+from collections import OrderedDict
+
+# seconds a shared cache may take to connect or answer before it is skipped
+CACHE_SOCKET_TIMEOUT = float(os.getenv("CACHE_SOCKET_TIMEOUT", "0.25"))
+
+logger = Logger(__name__)
+
+_MISSING = object()
+_CACHES: typ.List[typ.Any] = []
+
+
+class LRUCache:
+    """
+    Thread-safe, size bounded in-process cache with optional per-entry TTL.
+
+    Every gunicorn/flask worker holds its own copy, so values must be safe to
+    serve slightly stale until `ttl` expires or the owning handler invalidates.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: typ.Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        _CACHES.append(self)
+
+    def get(self, key: typ.Hashable, default: typ.Any = None) -> typ.Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: typ.Hashable, value: typ.Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: typ.Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_where(self, predicate: typ.Callable[[typ.Hashable], bool]) -> None:
+        """Drop every entry whose key matches `predicate`."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """
+    Cache kept on a Redis protocol server, shared by every worker.
+
+    `client` only needs `get`, `set(name, value, ex=...)`, `delete` and
+    `scan_iter`, e.g. a `redis.Redis` instance. Values must be JSON serializable.
+    Client `errors` are logged and served as misses, so an unavailable server
+    costs a database read rather than the request. Entries outlive the worker
+    and are not dropped by `clear_caches`.
+    """
+
+    def __init__(
+        self,
+        client: typ.Any,
+        prefix: str,
+        ttl: typ.Optional[float] = None,
+        errors: typ.Tuple[typ.Type[Exception], ...] = (),
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.errors = errors
+
+    def _name(self, key: typ.Hashable) -> str:
+        return f"{self.prefix}{key}"
+
+    def get(self, key: typ.Hashable, default: typ.Any = None) -> typ.Any:
+        try:
+            raw = self.client.get(self._name(key))
+        except self.errors as e:
+            logger.warning("cache get %s failed: %s", self._name(key), e)
+            return default
+
+        if raw is None:
+            return default
+        return json.loads(raw)
+
+    def set(self, key: typ.Hashable, value: typ.Any) -> None:
+        try:
+            self.client.set(
+                self._name(key),
+                json.dumps(value, separators=(",", ":")),
+                ex=int(self.ttl) if self.ttl else None,
+            )
+        except self.errors as e:
+            logger.warning("cache set %s failed: %s", self._name(key), e)
+
+    def delete(self, key: typ.Hashable) -> None:
+        try:
+            self.client.delete(self._name(key))
+        except self.errors as e:
+            logger.warning("cache delete %s failed: %s", self._name(key), e)
+
+    def clear(self) -> None:
+        try:
+            for name in self.client.scan_iter(match=f"{self.prefix}*"):
+                self.client.delete(name)
+        except self.errors as e:
+            logger.warning("cache clear %s* failed: %s", self.prefix, e)
+
+
+def make_cache(
+    url: typ.Optional[str],
+    *,
+    prefix: str,
+    maxsize: int = 1024,
+    ttl: typ.Optional[float] = None,
+) -> typ.Union[LRUCache, RedisCache]:
+    """A per-worker `LRUCache`, or a shared `RedisCache` when `url` is set."""
+    if not url:
+        return LRUCache(maxsize=maxsize, ttl=ttl)
+
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError("The `redis` package is required to use a cache URL.") from e
+
+    client = redis.Redis.from_url(
+        url,
+        socket_timeout=CACHE_SOCKET_TIMEOUT,
+        socket_connect_timeout=CACHE_SOCKET_TIMEOUT,
+    )
+    return RedisCache(
+        client, prefix=prefix, ttl=ttl, errors=(redis.exceptions.RedisError,)
+    )
+
+
+def clear_caches() -> None:
+    """Drop every entry of the per-worker caches, e.g. between tests."""
+    for cache in _CACHES:
+        cache.clear()
@@ -0,0 +1,153 @@
+import os
+import gzip
+import zlib
+import typing as typ
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional, `pip install brotli`
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, `pip install zstandard`
+    zstandard = None
+
+# bodies smaller than this are sent as is, compressing them rarely pays off
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html"}
+
+
+def _compress_brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+
+
+def _compress_zstd(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compress(data)
+
+
+def _compress_gzip(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=COMPRESSION_GZIP_LEVEL)
+
+
+# in order of preference when a client accepts several with the same quality
+_CODECS: typ.Dict[str, typ.Callable[[bytes], bytes]] = {
+    **({"br": _compress_brotli} if brotli else {}),
+    **({"zstd": _compress_zstd} if zstandard else {}),
+    "gzip": _compress_gzip,
+}
+
+
+# incremental compressors for streamed bodies, as (compress chunk, finish) pairs
+_StreamCompressor = typ.Tuple[typ.Callable[[bytes], bytes], typ.Callable[[], bytes]]
+
+
+def _brotli_stream() -> _StreamCompressor:
+    compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+    return compressor.process, compressor.finish
+
+
+def _zstd_stream() -> _StreamCompressor:
+    compressor = zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compressobj()
+    return compressor.compress, compressor.flush
+
+
+def _gzip_stream() -> _StreamCompressor:
+    compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+_STREAM_CODECS: typ.Dict[str, typ.Callable[[], _StreamCompressor]] = {
+    **({"br": _brotli_stream} if brotli else {}),
+    **({"zstd": _zstd_stream} if zstandard else {}),
+    "gzip": _gzip_stream,
+}
+
+
+def negotiate_encoding(size: int) -> typ.Optional[str]:
+    """Best content coding the client accepts for a body of `size` bytes, if any."""
+    if size < COMPRESSION_MIN_SIZE:
+        return None
+    return request.accept_encodings.best_match(list(_CODECS))
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    return _CODECS[encoding](data)
+
+
+class EncodedBody:
+    """
+    A cached response body together with the compressed variants served so far,
+    so each is compressed at most once per cache entry instead of per request.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self._variants: typ.Dict[str, bytes] = {}
+
+    def encode(self, encoding: str) -> bytes:
+        if (variant := self._variants.get(encoding)) is None:
+            variant = self._variants[encoding] = compress(self.data, encoding)
+        return variant
+
+
+def encoded_response(body: EncodedBody, mimetype: str = "application/json") -> Response:
+    response = Response(mimetype=mimetype)
+    response.vary.add("Accept-Encoding")
+    if encoding := negotiate_encoding(len(body.data)):
+        response.set_data(body.encode(encoding))
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response.set_data(body.data)
+    return response
+
+
+def _compress_chunks(
+    chunks: typ.Iterable[bytes], compressor: _StreamCompressor
+) -> typ.Iterator[bytes]:
+    compress, finish = compressor
+    for chunk in chunks:
+        if data := compress(chunk):
+            yield data
+    yield finish()
+
+
+def encoded_stream(
+    chunks: typ.Iterable[bytes], mimetype: str = "application/json"
+) -> Response:
+    """
+    A streamed response, compressed chunk by chunk when the client accepts it.
+    Only large bodies are streamed and their size is unknown up front, so there
+    is no minimum size.
+    """
+    response = Response(chunks, mimetype=mimetype)
+    response.vary.add("Accept-Encoding")
+    if encoding := request.accept_encodings.best_match(list(_STREAM_CODECS)):
+        response.response = _compress_chunks(chunks, _STREAM_CODECS[encoding]())
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def compress_response(response: Response) -> Response:
+    """`after_request` hook compressing JSON and text bodies the client accepts."""
+    if (
+        response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if encoding := negotiate_encoding(len(data)):
+        response.set_data(compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,27 @@
+import hashlib
+import typing as typ
+from flask import Response, make_response, request
+
+
+def make_etag(*parts: typ.Any) -> str:
+    """
+    Build an ETag from the values a representation is derived from (ids,
+    `updated_date`s, counters, viewer flags) rather than from the rendered body.
+    """
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def not_modified(etag: str) -> typ.Optional[Response]:
+    """Return a 304 response if `If-None-Match` still matches, `None` otherwise."""
+    if not request.if_none_match or not request.if_none_match.contains_weak(etag):
+        return None
+
+    return with_validators(Response(status=304), etag)
+
+
+def with_validators(rv: typ.Any, etag: str) -> Response:
+    """Attach an `ETag` header to a view's return value."""
+    response = make_response(rv)
+    # weak, the same representation may be sent with different content codings
+    response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,293 @@
+import os
+import heapq
+import typing as typ
+from datetime import datetime
+from itertools import islice
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import text as satext
+from realworld.api.core.cache import LRUCache
+
+# how many of an author's most recent articles are copied into a new follower's timeline
+FEED_BACKFILL_LIMIT = int(os.getenv("FEED_BACKFILL_LIMIT", "1000"))
+FEED_COUNT_CACHE_TTL = float(os.getenv("FEED_COUNT_CACHE_TTL", "30"))
+
+# authors with at least this many followers are not pushed into timelines,
+# their articles are pulled and merged in when a follower reads the feed;
+# `users.feed_pulled` is set by the follow that reaches the limit, and stays
+# set below it, as articles posted while pulled are in no timeline, until
+# the feeds are rebuilt
+FEED_FANOUT_FOLLOWER_LIMIT = int(os.getenv("FEED_FANOUT_FOLLOWER_LIMIT", "10000"))
+
+# user id -> number of items in the user's feed
+_FEED_COUNT_CACHE = LRUCache(maxsize=4096, ttl=FEED_COUNT_CACHE_TTL)
+
+FeedKey = typ.Tuple[datetime, str]
+
+
+#
+# Timeline maintenance for the fan-out-on-write `user_feed_items` table
+#
+
+
+def push_article(db_conn: Connection, article_id: str) -> int:
+    """
+    Copy a new article into the timeline of every follower of its author,
+    unless the author has too many followers to fan out to.
+    """
+    result = db_conn.execute(
+        satext(
+            """
+            WITH pushed AS (
+                INSERT INTO user_feed_items (user_id, article_id, author_user_id, created_date)
+                SELECT uf.user_id, a.id, a.author_user_id, a.created_date
+                FROM articles a
+                JOIN users au ON au.id = a.author_user_id
+                JOIN user_follows uf ON uf.following_user_id = a.author_user_id
+                WHERE a.id = :article_id
+                AND NOT au.feed_pulled
+                ON CONFLICT DO NOTHING
+                RETURNING user_id
+            )
+            SELECT
+                au.feed_pulled,
+                ARRAY(SELECT user_id FROM pushed) AS pushed_user_ids
+            FROM articles a
+            JOIN users au ON au.id = a.author_user_id
+            WHERE a.id = :article_id
+            """
+        ).bindparams(article_id=article_id)
+    ).fetchone()
+    if not result:
+        return 0
+
+    # a pushed article only moves the counts of the timelines it went into,
+    # a pulled author's followers are too many to list, so all counts go
+    if result.feed_pulled:
+        invalidate_feed_counts()
+    for user_id in result.pushed_user_ids:
+        _FEED_COUNT_CACHE.delete(str(user_id))
+    return len(result.pushed_user_ids)
+
+
+def backfill_feed(
+    db_conn: Connection, user_id: str, author_user_ids: typ.Sequence[str]
+) -> int:
+    """Copy the recent articles of newly followed authors into a user's timeline."""
+    if not author_user_ids:
+        return 0
+
+    result = db_conn.execute(
+        satext(
+            """
+            INSERT INTO user_feed_items (user_id, article_id, author_user_id, created_date)
+            SELECT :user_id, a.id, a.author_user_id, a.created_date
+            FROM users au
+            CROSS JOIN LATERAL (
+                SELECT id, author_user_id, created_date
+                FROM articles
+                WHERE author_user_id = au.id
+                ORDER BY created_date DESC
+                LIMIT :backfill_limit
+            ) a
+            WHERE au.id = ANY(CAST(:author_user_ids AS uuid[]))
+            AND NOT au.feed_pulled
+            ON CONFLICT DO NOTHING
+            """
+        ).bindparams(
+            user_id=user_id,
+            author_user_ids=[str(author_id) for author_id in author_user_ids],
+            backfill_limit=FEED_BACKFILL_LIMIT,
+        )
+    )
+    _FEED_COUNT_CACHE.delete(str(user_id))
+    return result.rowcount
+
+
+def trim_feed(
+    db_conn: Connection, user_id: str, author_user_ids: typ.Sequence[str]
+) -> int:
+    """Remove unfollowed authors' articles from a user's timeline."""
+    if not author_user_ids:
+        return 0
+
+    result = db_conn.execute(
+        satext(
+            """
+            DELETE FROM user_feed_items
+            WHERE user_id = :user_id
+            AND author_user_id = ANY(CAST(:author_user_ids AS uuid[]))
+            """
+        ).bindparams(
+            user_id=user_id,
+            author_user_ids=[str(author_id) for author_id in author_user_ids],
+        )
+    )
+    _FEED_COUNT_CACHE.delete(str(user_id))
+    return result.rowcount
+
+
+def rebuild_feeds(db_conn: Connection) -> int:
+    """
+    Rebuild every timeline from `user_follows` and `articles`. Authors kept
+    pulled below the fan-out limit are pushed again, as they are copied back,
+    and a changed limit is applied to every author.
+    """
+    db_conn.execute(
+        satext(
+            """
+            UPDATE users
+            SET feed_pulled = followers_count >= :fanout_limit
+            WHERE feed_pulled <> (followers_count >= :fanout_limit)
+            """
+        ).bindparams(fanout_limit=FEED_FANOUT_FOLLOWER_LIMIT)
+    )
+    db_conn.execute(satext("DELETE FROM user_feed_items"))
+    result = db_conn.execute(
+        satext(
+            """
+            INSERT INTO user_feed_items (user_id, article_id, author_user_id, created_date)
+            SELECT uf.user_id, a.id, a.author_user_id, a.created_date
+            FROM user_follows uf
+            JOIN users au ON au.id = uf.following_user_id
+            CROSS JOIN LATERAL (
+                SELECT id, author_user_id, created_date
+                FROM articles
+                WHERE author_user_id = uf.following_user_id
+                ORDER BY created_date DESC
+                LIMIT :backfill_limit
+            ) a
+            WHERE NOT au.feed_pulled
+            """
+        ).bindparams(backfill_limit=FEED_BACKFILL_LIMIT)
+    )
+    invalidate_feed_counts()
+    return result.rowcount
+
+
+#
+# Feed reads
+#
+
+
+def get_pulled_authors(db_conn: Connection, user_id: str) -> typ.List[str]:
+    """Followed authors whose articles are merged in at read time."""
+    result = db_conn.execute(
+        satext(
+            """
+            SELECT au.id
+            FROM user_follows uf
+            JOIN users au ON au.id = uf.following_user_id
+            WHERE uf.user_id = :user_id
+            AND au.feed_pulled
+            """
+        ).bindparams(user_id=user_id)
+    ).fetchall()
+    return [str(row.id) for row in result]
+
+
+def get_merged_feed_keys(
+    db_conn: Connection,
+    user_id: str,
+    pulled_author_ids: typ.Sequence[str],
+    *,
+    limit: int,
+    offset: int = 0,
+    before: typ.Optional[FeedKey] = None,
+) -> typ.List[FeedKey]:
+    """
+    Return up to `limit` (created_date, article_id) keys of a user's feed,
+    newest first, by k-way merging the pushed timeline with the most recent
+    articles of each pulled author. Every source is read with its own bounded
+    index range scan, so cost depends on `limit` rather than on follower counts.
+    """
+    params = {
+        "user_id": user_id,
+        "author_ids": list(pulled_author_ids),
+        "fetch": offset + limit,
+    }
+    timeline_before, articles_before = "", ""
+    if before:
+        params["before_created_date"], params["before_id"] = before
+        timeline_before = (
+            "AND (created_date, article_id)"
+            " < (:before_created_date, CAST(:before_id AS uuid))"
+        )
+        articles_before = (
+            "AND (created_date, id) < (:before_created_date, CAST(:before_id AS uuid))"
+        )
+
+    rows = db_conn.execute(
+        satext(
+            f"""
+            (
+                SELECT NULL::uuid AS author_user_id, created_date, article_id
+                FROM user_feed_items
+                WHERE user_id = :user_id
+                {timeline_before}
+                ORDER BY created_date DESC, article_id DESC
+                LIMIT :fetch
+            )
+            UNION ALL
+            (
+                SELECT authors.id, a.created_date, a.id
+                FROM UNNEST(CAST(:author_ids AS uuid[])) AS authors(id)
+                CROSS JOIN LATERAL (
+                    SELECT id, created_date
+                    FROM articles
+                    WHERE author_user_id = authors.id
+                    {articles_before}
+                    ORDER BY created_date DESC, id DESC
+                    LIMIT :fetch
+                ) a
+            )
+            """
+        ).bindparams(**params)
+    ).fetchall()
+
+    # each source arrives sorted newest first, so they can be merged lazily
+    sources: typ.Dict[typ.Optional[str], typ.List[FeedKey]] = {}
+    for row in rows:
+        author_key = str(row.author_user_id) if row.author_user_id else None
+        sources.setdefault(author_key, []).append(
+            (row.created_date, str(row.article_id))
+        )
+
+    seen = set()
+    merged = (
+        key
+        for key in heapq.merge(*sources.values(), reverse=True)
+        if not (key[1] in seen or seen.add(key[1]))
+    )
+    return list(islice(merged, offset, offset + limit))
+
+
+def invalidate_feed_counts() -> None:
+    _FEED_COUNT_CACHE.clear()
+
+
+def count_feed(db_conn: Connection, user_id: str) -> int:
+    """Number of articles in a user's feed, cached per worker."""
+    if (feed_count := _FEED_COUNT_CACHE.get(str(user_id))) is not None:
+        return feed_count
+
+    feed_count = db_conn.execute(
+        satext(
+            """
+            SELECT COUNT(*)
+            FROM (
+                SELECT article_id
+                FROM user_feed_items
+                WHERE user_id = :user_id
+                UNION
+                SELECT a.id
+                FROM user_follows uf
+                JOIN users au ON au.id = uf.following_user_id
+                JOIN articles a ON a.author_user_id = au.id
+                WHERE uf.user_id = :user_id
+                AND au.feed_pulled
+            ) feed
+            """
+        ).bindparams(user_id=user_id)
+    ).scalar()
+    _FEED_COUNT_CACHE.set(str(user_id), feed_count)
+    return feed_count
@@ -3,6 +3,8 @@ import typing as typ
 from datetime import datetime
 from pydantic import BaseModel, field_serializer
 
+_set_attr = object.__setattr__
+
 
 #
 # Base Models
@@ -20,6 +22,26 @@ class BaseCamelModel(BaseModel):
             kwargs["by_alias"] = True
         return super().model_dump(*args, **kwargs)
 
+    def model_dump_json(self, *args, **kwargs) -> str:
+        if "by_alias" not in kwargs:
+            kwargs["by_alias"] = True
+        return super().model_dump_json(*args, **kwargs)
+
+    @classmethod
+    def construct_trusted(cls, values: dict):
+        """
+        Build an instance from values that already have the field types, e.g. rows
+        read from our own schema, without validation. Unlike `model_construct` it
+        skips alias and default resolution, so `values` must hold every field by
+        name, in declaration order, and is used as the instance `__dict__` as is.
+        """
+        model = cls.__new__(cls)
+        _set_attr(model, "__dict__", values)
+        _set_attr(model, "__pydantic_fields_set__", set(values))
+        _set_attr(model, "__pydantic_extra__", None)
+        _set_attr(model, "__pydantic_private__", None)
+        return model
+
 
 #
 # Pagination Models
@@ -65,18 +87,24 @@ class DBUser(BaseCamelModel):
     updated_date: typ.Optional[datetime] = None
 
 
-class Article(BaseCamelModel):
+class ArticlePreview(BaseCamelModel):
+    """List representation of an article, everything but the body."""
+
     slug: str
     title: str
     description: str
-    body: str
     tag_list: list[str]
     created_at: datetime
     updated_at: datetime
     favorited: bool
     favorites_count: int
+    comments_count: int
     author: Profile
 
     @field_serializer("created_at", "updated_at", when_used="unless-none")
     def serialize_datetime(self, value: datetime, info):
         return value.isoformat()
+
+
+class Article(ArticlePreview):
+    body: str
@@ -0,0 +1,64 @@
+import os
+import json
+import base64
+import binascii
+import typing as typ
+
+
+# pages that are built in one piece are clamped to this many rows
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", "100"))
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client supplied pagination cursor cannot be decoded."""
+
+
+class InvalidLimitError(ValueError):
+    """Raised when a client supplied page `limit` or `offset` is out of range."""
+
+
+def parse_limit(
+    value: typ.Optional[str], default: int = 20, maximum: typ.Optional[int] = None
+) -> int:
+    """Validate a `limit` query argument, clamped to `maximum` when given."""
+    try:
+        limit = default if value is None else int(value)
+    except ValueError as e:
+        raise InvalidLimitError("Limit must be a positive integer.") from e
+
+    if limit < 1:
+        raise InvalidLimitError("Limit must be a positive integer.")
+
+    return min(limit, maximum) if maximum else limit
+
+
+def parse_offset(value: typ.Optional[str]) -> int:
+    """Validate an `offset` query argument."""
+    try:
+        offset = 0 if value is None else int(value)
+    except ValueError as e:
+        raise InvalidLimitError("Offset must be a non-negative integer.") from e
+
+    if offset < 0:
+        raise InvalidLimitError("Offset must be a non-negative integer.")
+
+    return offset
+
+
+def encode_cursor(*values: typ.Any) -> str:
+    """Encode keyset values (e.g. `created_date`, `id`) into an opaque cursor."""
+    payload = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> typ.Tuple[typ.Any, ...]:
+    """Decode an opaque cursor back into its `size` keyset values."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError("Invalid cursor.") from e
+
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Invalid cursor.")
+
+    return tuple(values)
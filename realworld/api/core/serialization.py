@@ -0,0 +1,87 @@
+import os
+import itertools
+import typing as typ
+from flask import Response, request
+from pydantic import BaseModel
+from realworld.api.core.compression import encoded_stream
+
+# larger request bodies are rejected with a 413 before they are read or parsed
+MAX_REQUEST_BODY_SIZE = int(os.getenv("MAX_REQUEST_BODY_SIZE", str(1024 * 1024)))
+
+# batch lookups (e.g. ?slugs=a,b,c) accept at most this many values
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "100"))
+
+ModelT = typ.TypeVar("ModelT", bound=BaseModel)
+
+
+def parse_request(model: typ.Type[ModelT]) -> ModelT:
+    """
+    Validate the raw request body against `model` in one pass, without first
+    decoding it into Python dicts. Invalid JSON raises a `ValidationError` (422)
+    and bodies over `MAX_CONTENT_LENGTH` a `RequestEntityTooLarge` (413).
+    """
+    return model.model_validate_json(request.get_data(cache=False))
+
+
+def parse_list_arg(name: str) -> typ.Optional[typ.List[str]]:
+    """
+    Comma separated values of the `name` query argument, deduplicated in
+    request order, or `None` when the argument is absent.
+    """
+    if (value := request.args.get(name)) is None:
+        return None
+    return list(
+        dict.fromkeys(item.strip() for item in value.split(",") if item.strip())
+    )
+
+
+def json_response(model: BaseModel, status: int = 200) -> Response:
+    """Encode `model` straight to JSON bytes using its camelCase aliases."""
+    return Response(
+        model.model_dump_json(by_alias=True), status=status, mimetype="application/json"
+    )
+
+
+def stream_json_list(
+    key: str,
+    batches: typ.Iterator[typ.Sequence[BaseModel]],
+    envelope: typ.Callable[[typ.Any], BaseModel],
+) -> typ.Iterator[bytes]:
+    """
+    Encode a list response one batch of models at a time, so only a batch is
+    held in memory. `key` is the alias of the envelope's list field, which must
+    be its first. Once `batches` is exhausted its return value is passed to
+    `envelope`, which builds the response around an empty list; the fields
+    after the list are cut from that, so the streamed body is byte for byte
+    what `json_response` would send.
+    """
+    opening = b'{"' + key.encode("utf-8") + b'":['
+    chunk, separator = opening, b""
+    while True:
+        try:
+            batch = next(batches)
+        except StopIteration as stop:
+            closing = envelope(stop.value).model_dump_json(by_alias=True)
+            yield chunk + closing.encode("utf-8")[len(opening) :]
+            return
+
+        if batch:
+            chunk += separator + b",".join(
+                model.model_dump_json(by_alias=True).encode("utf-8") for model in batch
+            )
+            separator = b","
+            yield chunk
+            chunk = b""
+
+
+def stream_json_response(chunks: typ.Generator[bytes, None, None]) -> Response:
+    """
+    Stream JSON `chunks`. The first chunk is produced before the response is
+    returned, so the queries behind it run, and fail, inside the view and get
+    regular error responses. `chunks` is closed with the response, which
+    releases whatever it holds when a client disconnects mid-stream.
+    """
+    first = next(chunks)
+    response = encoded_stream(itertools.chain((first,), chunks))
+    response.call_on_close(chunks.close)
+    return response
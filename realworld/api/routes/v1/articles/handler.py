@@ -1,9 +1,18 @@
+import os
 import re
 import typing as typ
-from uuid import uuid4
+from uuid import UUID, uuid4
+from datetime import datetime
 from sqlalchemy.engine import Connection
 from sqlalchemy.sql import text as satext
-from realworld.api.core.models import Article, Profile, Comment
+from realworld.api.core import feed
+from realworld.api.core.cache import LRUCache, make_cache
+from realworld.api.core.models import Article, ArticlePreview, Profile, Comment
+from realworld.api.core.pagination import (
+    InvalidCursorError,
+    encode_cursor,
+    decode_cursor,
+)
 
 from realworld.api.routes.v1.articles.models import (
     CreateArticleData,
@@ -11,40 +20,219 @@ from realworld.api.routes.v1.articles.models import (
     CreateCommentData,
 )
 
+ARTICLES_COUNT_CACHE_TTL = float(os.getenv("ARTICLES_COUNT_CACHE_TTL", "30"))
+ARTICLES_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv("ARTICLES_COUNT_ESTIMATE_THRESHOLD", "0")
+)
+
+SLUG_CACHE_SIZE = int(os.getenv("SLUG_CACHE_SIZE", "10000"))
+SLUG_CACHE_TTL = float(os.getenv("SLUG_CACHE_TTL", "300"))
+
+# e.g. redis://localhost:6379/0 to share cached articles between workers
+ARTICLE_CACHE_URL = os.getenv("ARTICLE_CACHE_URL")
+ARTICLE_CACHE_SIZE = int(os.getenv("ARTICLE_CACHE_SIZE", "10000"))
+ARTICLE_CACHE_TTL = float(os.getenv("ARTICLE_CACHE_TTL", "60"))
+
+# rows fetched from a server-side cursor, and hydrated, at a time when streaming
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "100"))
+
+# (tag, author, favorited) -> total articles count
+_ARTICLES_COUNT_CACHE = LRUCache(maxsize=4096, ttl=ARTICLES_COUNT_CACHE_TTL)
+
+# slug -> (article id, author user id), slugs are never reused so an entry can
+# only go stale by its article being renamed or deleted through another worker
+_SLUG_CACHE = LRUCache(maxsize=SLUG_CACHE_SIZE, ttl=SLUG_CACHE_TTL)
+
+# article id -> viewer independent article, `favorited` and `author.following`
+# are always stored as false and resolved per request
+_ARTICLE_CACHE = make_cache(
+    ARTICLE_CACHE_URL,
+    prefix="realworld:article:",
+    maxsize=ARTICLE_CACHE_SIZE,
+    ttl=ARTICLE_CACHE_TTL,
+)
+
+# bumped whenever the set of tags in use changes, readers key caches on it
+_tags_version = 0
+
+# bumped by every article write in this worker, readers key list caches on it
+_articles_version = 0
+
+# bumped by favorites instead, which only move counts outside favorited filters
+_favorites_version = 0
+
 #
 # Helpers
 #
 
 
+def get_tags_version() -> int:
+    return _tags_version
+
+
+def _bump_tags_version() -> None:
+    global _tags_version
+    _tags_version += 1
+
+
+def get_articles_version() -> int:
+    return _articles_version
+
+
+def _bump_articles_version() -> None:
+    global _articles_version
+    _articles_version += 1
+
+
+def get_favorites_version() -> int:
+    return _favorites_version
+
+
+def _bump_favorites_version() -> None:
+    global _favorites_version
+    _favorites_version += 1
+
+
 # return a URL-friendly article slug that likely unique
 def generate_slug(title: str) -> str:
     slug = re.sub(r"[^a-z0-9-_]", "", title.lower().replace(" ", "-"))
     return f"{slug}-{uuid4().hex[:8]}"
 
 
-def _get_curr_profile_by_id(db_conn: Connection, user_id: str) -> Profile:
-    result = db_conn.execute(
-        satext(
-            """
-            SELECT username, bio, image_url
-            FROM users
-            WHERE id = :user_id
-            """
-        ).bindparams(user_id=user_id)
+def _resolve_slug(db_conn: Connection, slug: str) -> typ.Optional[typ.Tuple[str, str]]:
+    """
+    Return the (article id, author user id) of a slug, cached per worker.
+    Entries can outlive a rename or delete through another worker, so
+    statements keyed on the id still match the slug as well.
+    """
+    if (ids := _SLUG_CACHE.get(slug)) is not None:
+        return ids
+
+    row = db_conn.execute(
+        satext("SELECT id, author_user_id FROM articles WHERE slug = :slug").bindparams(
+            slug=slug
+        )
     ).fetchone()
+    if not row:
+        return None
 
-    return Profile(
-        username=result.username,
-        bio=result.bio,
-        image=result.image_url,
-        following=False,  # unable to follow yourself
-    )
+    ids = (str(row.id), str(row.author_user_id))
+    _SLUG_CACHE.set(slug, ids)
+    return ids
+
+
+# keyset cursors are built on (created_date, id) so every page costs the same,
+# article and comment pages share them
+def _encode_article_cursor(row) -> str:
+    return encode_cursor(row.created_date.isoformat(), str(row.id))
+
+
+def _decode_article_cursor(cursor: str) -> typ.Tuple[datetime, str]:
+    created_date, article_id = decode_cursor(cursor, size=2)
+    try:
+        return datetime.fromisoformat(created_date), str(UUID(article_id))
+    except (TypeError, ValueError) as e:
+        raise InvalidCursorError("Invalid cursor.") from e
+
+
+# search results are ranked, so their keyset is (rank, id)
+def _encode_search_cursor(row) -> str:
+    return encode_cursor(row.rank, str(row.id))
+
+
+def _decode_search_cursor(cursor: str) -> typ.Tuple[float, str]:
+    rank, article_id = decode_cursor(cursor, size=2)
+    try:
+        return float(rank), str(UUID(article_id))
+    except (TypeError, ValueError) as e:
+        raise InvalidCursorError("Invalid cursor.") from e
+
+
+def _paginate_rows(
+    rows: typ.Sequence,
+    limit: int,
+    encode_row_cursor: typ.Callable[[typ.Any], str] = _encode_article_cursor,
+) -> typ.Tuple[list, typ.Optional[str]]:
+    # one extra row is fetched to know whether another page exists
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    # an empty page has no row to resume after
+    return page, encode_row_cursor(page[-1]) if page else None
+
+
+def _stream_page(
+    db_conn: Connection,
+    query,
+    limit: int,
+    hydrate: typ.Callable[[typ.Sequence], list],
+    encode_row_cursor: typ.Callable[[typ.Any], str] = _encode_article_cursor,
+) -> typ.Generator[list, None, typ.Optional[str]]:
+    """
+    Yield a page of `limit` rows as hydrated batches of `STREAM_BATCH_SIZE`,
+    read from a server-side cursor so only one batch is held at a time.
+    `query` selects one extra row, like for `_paginate_rows`, and the next
+    page's cursor is returned once the page is exhausted.
+    """
+    result = db_conn.execute(query, execution_options={"yield_per": STREAM_BATCH_SIZE})
+    remaining, last_row = limit, None
+    try:
+        for partition in result.partitions():
+            rows = partition[:remaining]
+            remaining -= len(rows)
+            if rows:
+                last_row = rows[-1]
+                yield hydrate(rows)
+            if len(partition) > len(rows):
+                return encode_row_cursor(last_row) if last_row else None
+    finally:
+        result.close()
+    return None
+
+
+def _article_filters(
+    *,
+    curr_user_id: typ.Optional[str] = None,
+    filter_tag: typ.Optional[str] = None,
+    author_username_filter: typ.Optional[str] = None,
+    favorited_by_username_filter: typ.Optional[str] = None,
+    curr_user_feed: typ.Optional[bool] = False,
+) -> typ.Tuple[typ.List[str], typ.List[str], dict]:
+    joins = []
+    where_clauses = []
+    params = {}
+
+    if filter_tag:
+        params["tag_filter"] = filter_tag
+        where_clauses.append("t.name = :tag_filter")
+        joins.append("JOIN article_tags at ON a.id = at.article_id")
+        joins.append("JOIN tags t ON at.tag_id = t.id")
+
+    if author_username_filter:
+        params["author_username"] = author_username_filter
+        where_clauses.append("u.username = :author_username")
+
+    if favorited_by_username_filter:
+        params["favorited_by_username"] = favorited_by_username_filter
+        joins.append("JOIN article_favorites uff ON a.id = uff.article_id")
+        joins.append("JOIN users uu ON uu.id = uff.user_id")
+        where_clauses.append("uu.username = :favorited_by_username")
+
+    # feeds are read from the materialized timeline rather than user_follows
+    if curr_user_feed and curr_user_id:
+        params["curr_user_id"] = curr_user_id
+        joins.append("JOIN user_feed_items fi ON a.id = fi.article_id")
+        where_clauses.append("fi.user_id = :curr_user_id")
+
+    return joins, where_clauses, params
 
 
 def _base_get_articles_query(
     *,
-    article_id: typ.Optional[int] = None,
+    article_id: typ.Optional[str] = None,
+    article_ids: typ.Optional[typ.Sequence[str]] = None,
     slug: typ.Optional[str] = None,
+    slugs: typ.Optional[typ.Sequence[str]] = None,
     curr_user_id: typ.Optional[str] = None,
     filter_tag: typ.Optional[str] = None,
     author_username_filter: typ.Optional[str] = None,
@@ -52,6 +240,8 @@ def _base_get_articles_query(
     curr_user_feed: typ.Optional[bool] = False,
     limit: typ.Optional[int] = 20,
     offset: typ.Optional[int] = 0,
+    cursor: typ.Optional[str] = None,
+    include_body: bool = True,
 ):
 
     joins = []
@@ -59,37 +249,52 @@ def _base_get_articles_query(
     params = {
         "limit": limit,
         "offset": offset,
-        "curr_user_id": curr_user_id,
     }
 
+    # the timeline copies created_date so feeds page over its own index
+    sort_date, sort_id = (
+        ("fi.created_date", "fi.article_id")
+        if curr_user_feed and curr_user_id
+        else ("a.created_date", "a.id")
+    )
+
+    # keyset mode takes precedence over offset paging
+    if cursor:
+        params["cursor_created_date"], params["cursor_id"] = _decode_article_cursor(
+            cursor
+        )
+        params["offset"] = 0
+        where_clauses.append(
+            f"({sort_date}, {sort_id})"
+            " < (:cursor_created_date, CAST(:cursor_id AS uuid))"
+        )
+
     if article_id:
         params["article_id"] = article_id
         where_clauses.append("a.id = :article_id")
 
+    if article_ids is not None:
+        params["article_ids"] = list(article_ids)
+        where_clauses.append("a.id = ANY(CAST(:article_ids AS uuid[]))")
+
     if slug:
         params["slug"] = slug
         where_clauses.append("a.slug = :slug")
 
-    if filter_tag:
-        params["tag_filter"] = filter_tag
-        where_clauses.append("t.name = :tag_filter")
-        joins.append("JOIN article_tags at ON a.id = at.article_id")
-        joins.append("JOIN tags t ON at.tag_id = t.id")
-
-    if author_username_filter:
-        params["author_username"] = author_username_filter
-        where_clauses.append("u.username = :author_username")
+    if slugs is not None:
+        params["slugs"] = list(slugs)
+        where_clauses.append("a.slug = ANY(CAST(:slugs AS text[]))")
 
-    if favorited_by_username_filter:
-        params["favorited_by_username"] = favorited_by_username_filter
-        joins.append("JOIN article_favorites uff ON a.id = uff.article_id")
-        joins.append("JOIN users uu ON uu.id = uff.user_id")
-        where_clauses.append("uu.username = :favorited_by_username")
-
-    if curr_user_feed and curr_user_id:
-        params["curr_user_id"] = curr_user_id
-        joins.append("JOIN user_follows uf ON a.author_user_id = uf.following_user_id")
-        where_clauses.append("uf.user_id = :curr_user_id")
+    filter_joins, filter_where_clauses, filter_params = _article_filters(
+        curr_user_id=curr_user_id,
+        filter_tag=filter_tag,
+        author_username_filter=author_username_filter,
+        favorited_by_username_filter=favorited_by_username_filter,
+        curr_user_feed=curr_user_feed,
+    )
+    joins.extend(filter_joins)
+    where_clauses.extend(filter_where_clauses)
+    params.update(filter_params)
 
     where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
 
@@ -100,45 +305,176 @@ def _base_get_articles_query(
                 a.slug,
                 a.title,
                 a.description,
-                a.body,
+                {"a.body," if include_body else ""}
                 a.created_date,
                 a.updated_date,
+                a.favorites_count,
+                a.comments_count,
+                u.id AS author_user_id,
                 u.username AS author_username,
                 u.bio AS author_bio,
-                u.image_url AS author_image,
-                (
-                    SELECT COUNT(*)
-                    FROM article_favorites f
-                    WHERE f.article_id = a.id
-                ) AS favorites_count,
-                (
-                    SELECT COUNT(*)
-                    FROM article_favorites f
-                    WHERE f.article_id = a.id AND f.user_id = :curr_user_id
-                ) AS favorited_by_curr_user,
-                (
-                    SELECT COUNT(*)
-                    FROM user_follows uf
-                    WHERE uf.user_id = :curr_user_id
-                    AND uf.following_user_id = u.id
-                ) > 0 AS is_curr_user_following,
-                (
-                    SELECT ARRAY_AGG(t.name)
-                    FROM tags t
-                    JOIN article_tags at ON t.id = at.tag_id
-                    WHERE at.article_id = a.id
-                ) AS tag_list
+                u.image_url AS author_image
             FROM articles a
             JOIN users u ON a.author_user_id = u.id
             {" ".join(joins)}
             {where_clause}
-            ORDER BY a.created_date DESC
+            ORDER BY {sort_date} DESC, {sort_id} DESC
             LIMIT :limit
             OFFSET :offset
         """
     ).bindparams(**params)
 
 
+def _hydrate_articles(
+    db_conn: Connection,
+    rows: typ.Sequence,
+    curr_user_id: typ.Optional[str],
+    include_body: bool = True,
+) -> typ.List[typ.Union[Article, ArticlePreview]]:
+    """
+    Resolve tags and viewer flags for a page of article rows using set-based
+    queries keyed by the page's ids instead of per-row subqueries. Rows
+    selected without a body become `ArticlePreview`s.
+    """
+    if not rows:
+        return []
+
+    article_ids = [str(row.id) for row in rows]
+    author_ids = list({str(row.author_user_id) for row in rows})
+
+    tag_lists = {
+        str(row.article_id): row.tag_list
+        for row in db_conn.execute(
+            satext(
+                """
+                SELECT at.article_id, ARRAY_AGG(t.name) AS tag_list
+                FROM article_tags at
+                JOIN tags t ON t.id = at.tag_id
+                WHERE at.article_id = ANY(CAST(:article_ids AS uuid[]))
+                GROUP BY at.article_id
+                """
+            ).bindparams(article_ids=article_ids)
+        ).fetchall()
+    }
+
+    # viewer specific flags are only resolved for authenticated requests
+    favorited_ids, following_ids = set(), set()
+    if curr_user_id:
+        viewer = db_conn.execute(
+            satext(
+                """
+                SELECT
+                    ARRAY(
+                        SELECT f.article_id::text
+                        FROM article_favorites f
+                        WHERE f.user_id = :curr_user_id
+                        AND f.article_id = ANY(CAST(:article_ids AS uuid[]))
+                    ) AS favorited_ids,
+                    ARRAY(
+                        SELECT uf.following_user_id::text
+                        FROM user_follows uf
+                        WHERE uf.user_id = :curr_user_id
+                        AND uf.following_user_id = ANY(CAST(:author_ids AS uuid[]))
+                    ) AS following_ids
+                """
+            ).bindparams(
+                curr_user_id=curr_user_id,
+                article_ids=article_ids,
+                author_ids=author_ids,
+            )
+        ).fetchone()
+        favorited_ids, following_ids = (
+            set(viewer.favorited_ids),
+            set(viewer.following_ids),
+        )
+
+    return [
+        _article_from_row(
+            row,
+            tag_list=tag_lists.get(str(row.id)) or [],
+            favorited=str(row.id) in favorited_ids,
+            following=str(row.author_user_id) in following_ids,
+            include_body=include_body,
+        )
+        for row in rows
+    ]
+
+
+#
+# Row mappers, rows come straight from our own schema so the models are built
+# without validation (see scripts/benchmark_row_mapping.py)
+#
+
+
+def _profile_from_row(row, following: bool) -> Profile:
+    return Profile.construct_trusted(
+        {
+            "username": row.author_username,
+            "following": following,
+            "bio": row.author_bio,
+            "image": row.author_image,
+        }
+    )
+
+
+def _article_from_row(
+    row,
+    *,
+    tag_list: typ.List[str],
+    favorited: bool,
+    following: bool,
+    include_body: bool = True,
+) -> typ.Union[Article, ArticlePreview]:
+    fields = {
+        "slug": row.slug,
+        "title": row.title,
+        "description": row.description,
+        "tag_list": tag_list,
+        "created_at": row.created_date,
+        "updated_at": row.updated_date,
+        "favorited": favorited,
+        "favorites_count": row.favorites_count,
+        "comments_count": row.comments_count,
+        "author": _profile_from_row(row, following),
+    }
+    if include_body:
+        fields["body"] = row.body
+        return Article.construct_trusted(fields)
+    return ArticlePreview.construct_trusted(fields)
+
+
+def _article_from_cache(fields: dict, *, favorited: bool, following: bool) -> Article:
+    # validated, unlike rows, as a shared cache can hold entries written by
+    # another release, and skipping it only saved ~1us per article
+    return Article.model_validate(
+        {
+            **fields,
+            "favorited": favorited,
+            "author": {**fields["author"], "following": following},
+        }
+    )
+
+
+def _comment_from_row(row, following: bool) -> Comment:
+    return Comment.construct_trusted(
+        {
+            "id": str(row.id),
+            "created_at": row.created_date,
+            "updated_at": row.updated_date,
+            "body": row.body,
+            "author": _profile_from_row(row, following),
+        }
+    )
+
+
+# planner row estimate, costs a plan instead of a scan of every matching row
+def _estimate_rows(db_conn: Connection, from_clause: str, params: dict) -> int:
+    plan = db_conn.execute(
+        satext(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_clause}").bindparams(**params)
+    ).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 #
 # Handlers
 #
@@ -153,39 +489,86 @@ def get_articles(
     favorited_by_username_filter: typ.Optional[str] = None,
     limit: typ.Optional[int] = 20,
     offset: typ.Optional[int] = 0,
-) -> typ.List[Article]:
-    articles = db_conn.execute(
+    cursor: typ.Optional[str] = None,
+    include_body: bool = False,
+) -> typ.Tuple[typ.List[typ.Union[Article, ArticlePreview]], typ.Optional[str]]:
+    articles, next_cursor = _paginate_rows(
+        db_conn.execute(
+            _base_get_articles_query(
+                curr_user_id=curr_user_id,
+                filter_tag=filter_tag,
+                author_username_filter=author_username_filter,
+                favorited_by_username_filter=favorited_by_username_filter,
+                limit=limit + 1,
+                offset=offset,
+                cursor=cursor,
+                include_body=include_body,
+            )
+        ).fetchall(),
+        limit,
+    )
+
+    return (
+        _hydrate_articles(db_conn, articles, curr_user_id, include_body),
+        next_cursor,
+    )
+
+
+def get_articles_by_slugs(
+    db_conn: Connection,
+    slugs: typ.Sequence[str],
+    curr_user_id: typ.Optional[str] = None,
+    include_body: bool = False,
+) -> typ.List[typ.Union[Article, ArticlePreview]]:
+    """
+    Look up many articles in one set query, in the order of `slugs`.
+    Unknown slugs are left out.
+    """
+    if not slugs:
+        return []
+
+    rows = db_conn.execute(
+        _base_get_articles_query(
+            slugs=slugs, limit=len(slugs), include_body=include_body
+        )
+    ).fetchall()
+
+    positions = {slug: position for position, slug in enumerate(slugs)}
+    rows.sort(key=lambda row: positions[row.slug])
+    return _hydrate_articles(db_conn, rows, curr_user_id, include_body)
+
+
+def stream_articles(
+    db_conn: Connection,
+    *,
+    curr_user_id: typ.Optional[str] = None,
+    filter_tag: typ.Optional[str] = None,
+    author_username_filter: typ.Optional[str] = None,
+    favorited_by_username_filter: typ.Optional[str] = None,
+    limit: int = 20,
+    offset: typ.Optional[int] = 0,
+    cursor: typ.Optional[str] = None,
+    include_body: bool = False,
+) -> typ.Iterator[typ.List[typ.Union[Article, ArticlePreview]]]:
+    """
+    `get_articles` as batches streamed from a server-side cursor, for pages too
+    large to build in one piece. The generator returns the next page's cursor.
+    """
+    return _stream_page(
+        db_conn,
         _base_get_articles_query(
             curr_user_id=curr_user_id,
             filter_tag=filter_tag,
             author_username_filter=author_username_filter,
             favorited_by_username_filter=favorited_by_username_filter,
-            limit=limit,
+            limit=limit + 1,
             offset=offset,
-        )
-    ).fetchall()
-
-    return [
-        Article(
-            id=article.id,
-            slug=article.slug,
-            title=article.title,
-            description=article.description,
-            body=article.body,
-            tag_list=article.tag_list if article.tag_list else [],
-            created_at=article.created_date,
-            updated_at=article.updated_date,
-            favorited=bool(article.favorited_by_curr_user),
-            favorites_count=article.favorites_count,
-            author=Profile(
-                bio=article.author_bio,
-                username=article.author_username,
-                following=bool(article.is_curr_user_following),
-                image=article.author_image,
-            ),
-        )
-        for article in articles
-    ]
+            cursor=cursor,
+            include_body=include_body,
+        ),
+        limit,
+        lambda rows: _hydrate_articles(db_conn, rows, curr_user_id, include_body),
+    )
 
 
 def get_feed_articles(
@@ -193,78 +576,329 @@ def get_feed_articles(
     curr_user_id: str,
     limit: typ.Optional[int] = 20,
     offset: typ.Optional[int] = 0,
-) -> typ.List[Article]:
-    articles = db_conn.execute(
-        _base_get_articles_query(
-            curr_user_id=curr_user_id,
-            curr_user_feed=True,
-            limit=limit,
-            offset=offset,
+    cursor: typ.Optional[str] = None,
+    include_body: bool = False,
+) -> typ.Tuple[typ.List[typ.Union[Article, ArticlePreview]], typ.Optional[str]]:
+    # authors above the fan-out threshold are not in the timeline and are
+    # merged in from their own articles instead
+    if not (pulled_author_ids := feed.get_pulled_authors(db_conn, curr_user_id)):
+        rows = db_conn.execute(
+            _base_get_articles_query(
+                curr_user_id=curr_user_id,
+                curr_user_feed=True,
+                limit=limit + 1,
+                offset=offset,
+                cursor=cursor,
+                include_body=include_body,
+            )
+        ).fetchall()
+    else:
+        feed_keys = feed.get_merged_feed_keys(
+            db_conn,
+            curr_user_id,
+            pulled_author_ids,
+            limit=limit + 1,
+            offset=0 if cursor else offset,
+            before=_decode_article_cursor(cursor) if cursor else None,
         )
+        rows_by_id = {
+            str(row.id): row
+            for row in db_conn.execute(
+                _base_get_articles_query(
+                    article_ids=[article_id for _, article_id in feed_keys],
+                    limit=len(feed_keys),
+                    include_body=include_body,
+                )
+            ).fetchall()
+        }
+        rows = [
+            rows_by_id[article_id]
+            for _, article_id in feed_keys
+            if article_id in rows_by_id
+        ]
+
+    articles, next_cursor = _paginate_rows(rows, limit)
+    return (
+        _hydrate_articles(db_conn, articles, curr_user_id, include_body),
+        next_cursor,
+    )
+
+
+def count_articles(
+    db_conn: Connection,
+    *,
+    curr_user_id: typ.Optional[str] = None,
+    filter_tag: typ.Optional[str] = None,
+    author_username_filter: typ.Optional[str] = None,
+    favorited_by_username_filter: typ.Optional[str] = None,
+    curr_user_feed: typ.Optional[bool] = False,
+) -> int:
+    """
+    Total number of articles matching a filter combination (or the viewer's
+    feed), served from a per-worker TTL cache that is dropped whenever an
+    article is created or deleted. Above `ARTICLES_COUNT_ESTIMATE_THRESHOLD` the planner's row
+    estimate is returned instead of an exact count.
+    """
+    if curr_user_feed:
+        return feed.count_feed(db_conn, curr_user_id)
+
+    cache_key = (filter_tag, author_username_filter, favorited_by_username_filter)
+    if (articles_count := _ARTICLES_COUNT_CACHE.get(cache_key)) is not None:
+        return articles_count
+
+    joins, where_clauses, params = _article_filters(
+        curr_user_id=curr_user_id,
+        filter_tag=filter_tag,
+        author_username_filter=author_username_filter,
+        favorited_by_username_filter=favorited_by_username_filter,
+        curr_user_feed=curr_user_feed,
+    )
+    where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    from_clause = f"""
+        FROM articles a
+        JOIN users u ON a.author_user_id = u.id
+        {" ".join(joins)}
+        {where_clause}
+    """
+
+    articles_count = None
+    if ARTICLES_COUNT_ESTIMATE_THRESHOLD > 0:
+        estimate = _estimate_rows(db_conn, from_clause, params)
+        if estimate >= ARTICLES_COUNT_ESTIMATE_THRESHOLD:
+            articles_count = estimate
+
+    if articles_count is None:
+        articles_count = db_conn.execute(
+            satext(f"SELECT COUNT(*) {from_clause}").bindparams(**params)
+        ).scalar()
+
+    _ARTICLES_COUNT_CACHE.set(cache_key, articles_count)
+    return articles_count
+
+
+def search_articles(
+    db_conn: Connection,
+    query: str,
+    *,
+    curr_user_id: typ.Optional[str] = None,
+    limit: typ.Optional[int] = 20,
+    offset: typ.Optional[int] = 0,
+    cursor: typ.Optional[str] = None,
+    include_body: bool = False,
+) -> typ.Tuple[typ.List[typ.Union[Article, ArticlePreview]], typ.Optional[str], int]:
+    """
+    Full-text search over title, description and body using the GIN indexed
+    `search_vector` column, best matches first. Returns the page, the next
+    cursor and the (cached) total number of matches.
+    """
+    params = {"query": query, "limit": limit + 1, "offset": offset}
+    cursor_clause = ""
+    if cursor:
+        params["cursor_rank"], params["cursor_id"] = _decode_search_cursor(cursor)
+        params["offset"] = 0
+        cursor_clause = """
+            AND (ts_rank(a.search_vector, q.query), a.id)
+            < (CAST(:cursor_rank AS real), CAST(:cursor_id AS uuid))
+        """
+
+    rows = db_conn.execute(
+        satext(
+            f"""
+            SELECT
+                a.id,
+                a.slug,
+                a.title,
+                a.description,
+                {"a.body," if include_body else ""}
+                a.created_date,
+                a.updated_date,
+                a.favorites_count,
+                a.comments_count,
+                u.id AS author_user_id,
+                u.username AS author_username,
+                u.bio AS author_bio,
+                u.image_url AS author_image,
+                ts_rank(a.search_vector, q.query) AS rank
+            FROM websearch_to_tsquery('english', :query) AS q(query)
+            JOIN articles a ON a.search_vector @@ q.query
+            {cursor_clause}
+            JOIN users u ON a.author_user_id = u.id
+            ORDER BY rank DESC, a.id DESC
+            LIMIT :limit
+            OFFSET :offset
+            """
+        ).bindparams(**params)
     ).fetchall()
+    articles, next_cursor = _paginate_rows(rows, limit, _encode_search_cursor)
+
+    cache_key = ("search", query)
+    if (articles_count := _ARTICLES_COUNT_CACHE.get(cache_key)) is None:
+        articles_count = db_conn.execute(
+            satext(
+                """
+                SELECT COUNT(*)
+                FROM articles a
+                WHERE a.search_vector @@ websearch_to_tsquery('english', :query)
+                """
+            ).bindparams(query=query)
+        ).scalar()
+        _ARTICLES_COUNT_CACHE.set(cache_key, articles_count)
+
+    return (
+        _hydrate_articles(db_conn, articles, curr_user_id, include_body),
+        next_cursor,
+        articles_count,
+    )
+
+
+def get_article_version(
+    db_conn: Connection, slug: str, curr_user_id: typ.Optional[str]
+):
+    """
+    Everything a single article response can change with, read by primary key
+    so conditional requests are answered before the article is hydrated.
+    """
+    if not (ids := _resolve_slug(db_conn, slug)):
+        return None
 
+    version = db_conn.execute(
+        satext(
+            """
+            SELECT
+                a.id,
+                a.updated_date,
+                a.favorites_count,
+                a.comments_count,
+                u.updated_date AS author_updated_date,
+                EXISTS(
+                    SELECT 1
+                    FROM article_favorites f
+                    WHERE f.article_id = a.id
+                    AND f.user_id = :curr_user_id
+                ) AS favorited,
+                EXISTS(
+                    SELECT 1
+                    FROM user_follows uf
+                    WHERE uf.following_user_id = a.author_user_id
+                    AND uf.user_id = :curr_user_id
+                ) AS following
+            FROM articles a
+            JOIN users u ON u.id = a.author_user_id
+            WHERE a.id = :article_id
+            AND a.slug = :slug
+            """
+        ).bindparams(article_id=ids[0], slug=slug, curr_user_id=curr_user_id)
+    ).fetchone()
+    if version is None:
+        # renamed or deleted by another worker since the slug was cached
+        _SLUG_CACHE.delete(slug)
+    return version
+
+
+def _article_cache_version(version) -> list:
+    # JSON friendly, so entries in a shared cache compare the same way
     return [
-        Article(
-            id=article.id,
-            slug=article.slug,
-            title=article.title,
-            description=article.description,
-            body=article.body,
-            tag_list=article.tag_list if article.tag_list else [],
-            created_at=article.created_date,
-            updated_at=article.updated_date,
-            favorited=bool(article.favorited_by_curr_user),
-            favorites_count=article.favorites_count,
-            author=Profile(
-                bio=article.author_bio,
-                username=article.author_username,
-                following=bool(article.is_curr_user_following),
-                image=article.author_image,
-            ),
-        )
-        for article in articles
+        version.updated_date.isoformat(),
+        version.author_updated_date.isoformat(),
+        version.favorites_count,
+        version.comments_count,
     ]
 
 
 def get_article_by_slug(
-    db_conn: Connection, slug: str, curr_user_id: typ.Optional[str]
+    db_conn: Connection,
+    slug: str,
+    curr_user_id: typ.Optional[str],
+    version: typ.Optional[typ.Any] = None,
 ) -> typ.Optional[Article]:
-    article = db_conn.execute(
-        _base_get_articles_query(slug=slug, curr_user_id=curr_user_id)
-    ).fetchone()
-
-    if not article:
+    """
+    Read through the shared article cache, then overlay the viewer's flags,
+    taken from `version` when the caller already has it. Entries are tagged
+    with the version they were built for and refilled when it moved on, so
+    writes through other workers are never served stale under a new ETag.
+    """
+    if not (version := version or get_article_version(db_conn, slug, curr_user_id)):
         return None
 
-    return Article(
-        id=article.id,
-        slug=article.slug,
-        title=article.title,
-        description=article.description,
-        body=article.body,
-        tag_list=article.tag_list if article.tag_list else [],
-        created_at=article.created_date,
-        updated_at=article.updated_date,
-        favorited=bool(article.favorited_by_curr_user),
-        favorites_count=article.favorites_count,
-        author=Profile(
-            bio=article.author_bio,
-            username=article.author_username,
-            following=bool(article.is_curr_user_following),
-            image=article.author_image,
-        ),
+    article_id = str(version.id)
+    cache_version = _article_cache_version(version)
+    cached = _ARTICLE_CACHE.get(article_id)
+    if cached is None or cached.get("version") != cache_version:
+        row = db_conn.execute(
+            _base_get_articles_query(article_id=article_id)
+        ).fetchone()
+        if not row:
+            return None
+
+        # the row is read after `version`, so it can only be newer than its
+        # tag, which costs the next reader a refill rather than a stale body
+        cached = {
+            "version": cache_version,
+            "article": _hydrate_articles(db_conn, [row], None)[0].model_dump(
+                mode="json", by_alias=False
+            ),
+        }
+        _ARTICLE_CACHE.set(article_id, cached)
+
+    # anonymous versions read both flags as false, like the cached article
+    return _article_from_cache(
+        cached["article"], favorited=version.favorited, following=version.following
     )
 
 
 def create_article(
     db_conn: Connection, curr_user_id: str, data: CreateArticleData
 ) -> Article:
+    # the article, its deduped tags and their links are written and returned
+    # together with the author in one statement, a count of 1 marks tags that
+    # are newly in use, whether inserted or revived from a count of 0
     article = db_conn.execute(
         satext(
             """
-            INSERT INTO articles (author_user_id, slug, title, description, body)
-            VALUES (:author_user_id, :slug, :title, :description, :body)
-            RETURNING id, slug
+            WITH inserted AS (
+                INSERT INTO articles (author_user_id, slug, title, description, body)
+                VALUES (:author_user_id, :slug, :title, :description, :body)
+                RETURNING
+                    id,
+                    author_user_id,
+                    slug,
+                    title,
+                    description,
+                    body,
+                    created_date,
+                    updated_date,
+                    favorites_count,
+                    comments_count
+            ),
+            tag_names AS (
+                SELECT DISTINCT name
+                FROM UNNEST(CAST(:tag_names AS text[])) AS tag_names(name)
+            ),
+            upserted_tags AS (
+                INSERT INTO tags (name, articles_count)
+                SELECT name, 1
+                FROM tag_names
+                ORDER BY name
+                ON CONFLICT (name) DO UPDATE
+                SET articles_count = tags.articles_count + 1
+                RETURNING id, name, articles_count = 1 AS newly_used
+            ),
+            linked_tags AS (
+                INSERT INTO article_tags (article_id, tag_id)
+                SELECT i.id, ut.id
+                FROM inserted i
+                CROSS JOIN upserted_tags ut
+            )
+            SELECT
+                i.*,
+                u.username AS author_username,
+                u.bio AS author_bio,
+                u.image_url AS author_image,
+                ARRAY(SELECT name FROM upserted_tags) AS tag_list,
+                COALESCE((SELECT BOOL_OR(newly_used) FROM upserted_tags), false)
+                    AS new_tags
+            FROM inserted i
+            JOIN users u ON u.id = i.author_user_id
             """
         ).bindparams(
             author_user_id=curr_user_id,
@@ -272,213 +906,539 @@ def create_article(
             title=data.title,
             description=data.description,
             body=data.body,
+            tag_names=list(data.tag_list or []),
         )
     ).fetchone()
+    if article.new_tags:
+        _bump_tags_version()
 
-    if data.tag_list:
-        db_conn.execute(
-            satext(
-                """
-                WITH upserted_tags AS (
-                    INSERT INTO tags (name)
-                    VALUES (:name)
-                    ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
-                    RETURNING id
-                )
-                INSERT INTO article_tags (article_id, tag_id)
-                SELECT :article_id, id
-                FROM upserted_tags
-                """
-            ),
-            [{"name": tag, "article_id": article.id} for tag in data.tag_list],
-        )
+    feed.push_article(db_conn, article.id)
 
-    return get_article_by_slug(db_conn, article.slug, curr_user_id)
+    _ARTICLES_COUNT_CACHE.clear()
+    _bump_articles_version()
+    return _article_from_row(
+        article,
+        tag_list=article.tag_list,
+        favorited=False,
+        following=False,  # unable to follow yourself
+    )
 
 
 def update_article(
     db_conn: Connection, curr_slug: str, curr_user_id: str, data: UpdateArticleData
-) -> Article:
+) -> typ.Optional[Article]:
+    ids = _resolve_slug(db_conn, curr_slug)
+    if not ids or ids[1] != str(curr_user_id):
+        return None
 
     update_str = ""
     params = {}
-    new_slug = None
     for key in ("title", "description", "body"):
         if value := getattr(data, key):
 
             if key == "title":
                 update_str += "slug = :new_slug, "
-                new_slug = generate_slug(value)
-                params["new_slug"] = new_slug
+                params["new_slug"] = generate_slug(value)
 
             update_str += f"{key} = :{key}, "
             params[key] = value
 
-    db_conn.execute(
+    article = db_conn.execute(
         satext(
             f"""
-            UPDATE articles
-            SET {update_str}
-                updated_date = CURRENT_TIMESTAMP
-            WHERE slug = :slug
-            AND author_user_id = :curr_user_id
+            WITH updated AS (
+                UPDATE articles
+                SET {update_str}
+                    updated_date = CURRENT_TIMESTAMP
+                WHERE id = :article_id
+                AND slug = :curr_slug
+                AND author_user_id = :curr_user_id
+                RETURNING
+                    id,
+                    author_user_id,
+                    slug,
+                    title,
+                    description,
+                    body,
+                    created_date,
+                    updated_date,
+                    favorites_count,
+                    comments_count
+            )
+            SELECT
+                up.*,
+                u.username AS author_username,
+                u.bio AS author_bio,
+                u.image_url AS author_image,
+                ARRAY(
+                    SELECT t.name
+                    FROM article_tags at
+                    JOIN tags t ON t.id = at.tag_id
+                    WHERE at.article_id = up.id
+                ) AS tag_list,
+                EXISTS(
+                    SELECT 1
+                    FROM article_favorites f
+                    WHERE f.article_id = up.id
+                    AND f.user_id = :curr_user_id
+                ) AS favorited
+            FROM updated up
+            JOIN users u ON u.id = up.author_user_id
             """
         ).bindparams(
-            slug=curr_slug,
+            article_id=ids[0],
+            curr_slug=curr_slug,
             curr_user_id=curr_user_id,
             **params,
         )
-    )
+    ).fetchone()
+
+    # a new title regenerates the slug
+    _SLUG_CACHE.delete(curr_slug)
+    _ARTICLE_CACHE.delete(ids[0])
+    if not article:
+        return None
 
-    slug = new_slug if new_slug else curr_slug
-    return get_article_by_slug(db_conn, slug, curr_user_id)
+    _bump_articles_version()
+    return _article_from_row(
+        article,
+        tag_list=article.tag_list,
+        favorited=article.favorited,
+        following=False,  # unable to follow yourself
+    )
 
 
 def delete_article(db_conn: Connection, slug: str, curr_user_id: str) -> bool:
-    result = db_conn.execute(
+    ids = _resolve_slug(db_conn, slug)
+    if not ids or ids[1] != str(curr_user_id):
+        return False
+
+    # timeline rows are trimmed by the user_feed_items ON DELETE CASCADE,
+    # article_tags rows are still visible to the tag counter in this snapshot
+    deleted = db_conn.execute(
         satext(
             """
-            DELETE FROM articles
-            WHERE slug = :slug
-            AND author_user_id = :curr_user_id
+            WITH deleted AS (
+                DELETE FROM articles
+                WHERE id = :article_id
+                AND slug = :slug
+                AND author_user_id = :curr_user_id
+                RETURNING id
+            ),
+            untagged AS (
+                UPDATE tags
+                SET articles_count = articles_count - 1
+                WHERE id IN (
+                    SELECT at.tag_id
+                    FROM article_tags at
+                    WHERE at.article_id IN (SELECT id FROM deleted)
+                )
+                RETURNING articles_count
+            )
+            SELECT
+                (SELECT COUNT(*) FROM deleted) AS deleted,
+                (SELECT COUNT(*) FROM untagged WHERE articles_count = 0) AS unused_tags
             """
-        ).bindparams(slug=slug, curr_user_id=curr_user_id)
-    )
-    return bool(result.rowcount)
+        ).bindparams(article_id=ids[0], slug=slug, curr_user_id=curr_user_id)
+    ).fetchone()
+    _SLUG_CACHE.delete(slug)
+    _ARTICLE_CACHE.delete(ids[0])
+    if deleted.deleted:
+        _ARTICLES_COUNT_CACHE.clear()
+        _bump_articles_version()
+        feed.invalidate_feed_counts()
+    if deleted.unused_tags:
+        _bump_tags_version()
+    return bool(deleted.deleted)
 
 
 def create_article_comment(
     db_conn: Connection, slug: str, curr_user_id: str, data: CreateCommentData
 ) -> typ.Tuple[bool, Comment]:
+    if not (ids := _resolve_slug(db_conn, slug)):
+        return False, None
+
+    # the article's comments_count moves in the same statement as the insert
     result = db_conn.execute(
         satext(
             """
-            INSERT INTO article_comments (article_id, commenter_user_id, body)
-            VALUES (
-                (SELECT id FROM articles WHERE slug = :slug),
-                :curr_user_id,
-                :body
+            WITH inserted AS (
+                INSERT INTO article_comments (article_id, commenter_user_id, body)
+                SELECT id, :curr_user_id, :body
+                FROM articles
+                WHERE id = :article_id
+                AND slug = :slug
+                RETURNING id, article_id, commenter_user_id, created_date, updated_date, body
+            ),
+            counted AS (
+                UPDATE articles
+                SET comments_count = comments_count + 1
+                WHERE id IN (SELECT article_id FROM inserted)
             )
-            RETURNING id, created_date, body
+            SELECT
+                i.id,
+                i.created_date,
+                i.updated_date,
+                i.body,
+                u.username AS author_username,
+                u.bio AS author_bio,
+                u.image_url AS author_image
+            FROM inserted i
+            JOIN users u ON u.id = i.commenter_user_id
             """
-        ).bindparams(slug=slug, curr_user_id=curr_user_id, body=data.body)
+        ).bindparams(
+            article_id=ids[0], slug=slug, curr_user_id=curr_user_id, body=data.body
+        )
     ).fetchone()
 
     if not result:
+        _SLUG_CACHE.delete(slug)
         return False, None
 
-    return True, Comment(
-        id=str(result.id),
-        created_at=result.created_date,
-        updated_at=result.created_date,
-        body=result.body,
-        author=_get_curr_profile_by_id(db_conn, curr_user_id),
-    )
+    _ARTICLE_CACHE.delete(ids[0])
+    _bump_articles_version()
+    return True, _comment_from_row(result, following=False)  # unable to follow yourself
 
 
-def get_article_comments(
-    db_conn: Connection, slug: str, curr_user_id: typ.Optional[str]
-) -> typ.List[Comment]:
-    result = db_conn.execute(
-        satext(
-            """
-            SELECT
-                ac.id,
-                ac.body,
-                ac.created_date,
-                ac.updated_date,
-                u.username,
-                u.bio,
-                u.image_url,
-                (
-                    SELECT COUNT(*)
-                    FROM user_follows uf
-                    WHERE uf.user_id = :curr_user_id
-                    AND uf.following_user_id = u.id
-                ) > 0 AS is_following
-            FROM article_comments ac
-            JOIN users u ON ac.commenter_user_id = u.id
-            JOIN articles a ON ac.article_id = a.id
-            WHERE a.slug = :slug
-            """
-        ).bindparams(slug=slug, curr_user_id=curr_user_id)
-    ).fetchall()
+def _article_comments_query(
+    article_id: str,
+    slug: str,
+    curr_user_id: typ.Optional[str],
+    limit: int,
+    cursor: typ.Optional[str] = None,
+):
+    # anonymous viewers follow nobody, so the follow lookup is skipped entirely
+    is_following, follows_join = "FALSE", ""
+    params = {"article_id": article_id, "slug": slug, "limit": limit}
+    if curr_user_id:
+        is_following = "uf.following_user_id IS NOT NULL"
+        follows_join = """
+            LEFT JOIN user_follows uf
+            ON uf.following_user_id = u.id AND uf.user_id = :curr_user_id
+        """
+        params["curr_user_id"] = curr_user_id
 
-    if not result:
-        return []
+    after_cursor = ""
+    if cursor:
+        params["cursor_created_date"], params["cursor_id"] = _decode_article_cursor(
+            cursor
+        )
+        after_cursor = (
+            "AND (ac.created_date, ac.id)"
+            " > (:cursor_created_date, CAST(:cursor_id AS uuid))"
+        )
 
-    comments = []
-    for row in result:
-        comments.append(
-            Comment(
-                id=str(row.id),
-                body=row.body,
-                created_at=row.created_date,
-                updated_at=row.updated_date,
-                author=Profile(
-                    username=row.username,
-                    bio=row.bio,
-                    image=row.image_url,
-                    following=bool(row.is_following),
-                ),
-            )
+    return satext(
+        f"""
+        SELECT
+            ac.id,
+            ac.body,
+            ac.created_date,
+            ac.updated_date,
+            u.username AS author_username,
+            u.bio AS author_bio,
+            u.image_url AS author_image,
+            {is_following} AS is_following
+        FROM article_comments ac
+        JOIN users u ON ac.commenter_user_id = u.id
+        {follows_join}
+        WHERE ac.article_id = (
+            SELECT id FROM articles WHERE id = :article_id AND slug = :slug
         )
+        {after_cursor}
+        ORDER BY ac.created_date, ac.id
+        LIMIT :limit
+        """
+    ).bindparams(**params)
+
+
+def _comments_from_rows(rows: typ.Sequence) -> typ.List[Comment]:
+    return [_comment_from_row(row, bool(row.is_following)) for row in rows]
+
+
+def get_article_comments(
+    db_conn: Connection,
+    slug: str,
+    curr_user_id: typ.Optional[str],
+    limit: int = 20,
+    cursor: typ.Optional[str] = None,
+) -> typ.Tuple[typ.List[Comment], typ.Optional[str]]:
+    """
+    A page of an article's comments, oldest first. Pages are sought on the
+    (article_id, created_date, id) index, so they cost the same at any depth.
+    """
+    if not (ids := _resolve_slug(db_conn, slug)):
+        return [], None
+
+    rows, next_cursor = _paginate_rows(
+        db_conn.execute(
+            _article_comments_query(ids[0], slug, curr_user_id, limit + 1, cursor)
+        ).fetchall(),
+        limit,
+    )
+    return _comments_from_rows(rows), next_cursor
 
-    return comments
+
+def stream_article_comments(
+    db_conn: Connection,
+    slug: str,
+    curr_user_id: typ.Optional[str],
+    limit: int,
+    cursor: typ.Optional[str] = None,
+) -> typ.Iterator[typ.List[Comment]]:
+    """`get_article_comments` as batches streamed from a server-side cursor."""
+    if not (ids := _resolve_slug(db_conn, slug)):
+        return iter(())
+
+    return _stream_page(
+        db_conn,
+        _article_comments_query(ids[0], slug, curr_user_id, limit + 1, cursor),
+        limit,
+        _comments_from_rows,
+    )
 
 
 def delete_article_comment(
     db_conn: Connection, slug: str, comment_id: int, curr_user_id: str
 ) -> bool:
-    db_conn.execute(
+    if not (ids := _resolve_slug(db_conn, slug)):
+        return True
+
+    deleted = db_conn.execute(
         satext(
             """
-            DELETE FROM article_comments
-            WHERE id = :comment_id
-            AND article_id = (SELECT id FROM articles WHERE slug = :slug)
-            AND commenter_user_id = :curr_user_id
+            WITH deleted AS (
+                DELETE FROM article_comments
+                WHERE id = :comment_id
+                AND article_id = (
+                    SELECT id FROM articles WHERE id = :article_id AND slug = :slug
+                )
+                AND commenter_user_id = :curr_user_id
+                RETURNING article_id
+            )
+            UPDATE articles
+            SET comments_count = comments_count - 1
+            WHERE id IN (SELECT article_id FROM deleted)
             """
-        ).bindparams(slug=slug, comment_id=comment_id, curr_user_id=curr_user_id)
+        ).bindparams(
+            article_id=ids[0],
+            slug=slug,
+            comment_id=comment_id,
+            curr_user_id=curr_user_id,
+        )
     )
+    if deleted.rowcount:
+        _ARTICLE_CACHE.delete(ids[0])
+        _bump_articles_version()
     return True
 
 
-def add_article_favorite(
-    db_conn: Connection, slug: str, curr_user_id: str
+def set_article_favorite(
+    db_conn: Connection, slug: str, curr_user_id: str, favorited: bool
 ) -> typ.Optional[Article]:
-    db_conn.execute(
-        satext(
+    """
+    Favorite or unfavorite an article and return it in the same statement.
+    The counter only moves when a favorite row was actually inserted or
+    deleted, and the updated count is read back from that UPDATE since the
+    outer SELECT still sees the article row as it was before the statement.
+    """
+    if favorited:
+        mutation, delta = (
             """
             INSERT INTO article_favorites (article_id, user_id)
-            SELECT a.id, :user_id
-            FROM articles a
-            WHERE a.slug = :slug 
+            SELECT id, :curr_user_id
+            FROM target
             ON CONFLICT DO NOTHING
+            RETURNING article_id
+            """,
+            "+ 1",
+        )
+    else:
+        mutation, delta = (
             """
-        ).bindparams(slug=slug, user_id=curr_user_id)
+            DELETE FROM article_favorites
+            WHERE article_id = (SELECT id FROM target)
+            AND user_id = :curr_user_id
+            RETURNING article_id
+            """,
+            "- 1",
+        )
+
+    if not (ids := _resolve_slug(db_conn, slug)):
+        return None
+
+    article = db_conn.execute(
+        satext(
+            f"""
+            WITH target AS (
+                SELECT id
+                FROM articles
+                WHERE id = :article_id
+                AND slug = :slug
+            ),
+            changed AS ({mutation}),
+            counted AS (
+                UPDATE articles
+                SET favorites_count = favorites_count {delta}
+                WHERE id IN (SELECT article_id FROM changed)
+                RETURNING id, favorites_count
+            )
+            SELECT
+                a.id,
+                a.author_user_id,
+                a.slug,
+                a.title,
+                a.description,
+                a.body,
+                a.created_date,
+                a.updated_date,
+                COALESCE(c.favorites_count, a.favorites_count) AS favorites_count,
+                a.comments_count,
+                u.username AS author_username,
+                u.bio AS author_bio,
+                u.image_url AS author_image,
+                ARRAY(
+                    SELECT t.name
+                    FROM article_tags at
+                    JOIN tags t ON t.id = at.tag_id
+                    WHERE at.article_id = a.id
+                ) AS tag_list,
+                EXISTS(
+                    SELECT 1
+                    FROM user_follows uf
+                    WHERE uf.user_id = :curr_user_id
+                    AND uf.following_user_id = a.author_user_id
+                ) AS following,
+                (SELECT username FROM users WHERE id = :curr_user_id)
+                    AS favoriter_username
+            FROM articles a
+            JOIN users u ON u.id = a.author_user_id
+            LEFT JOIN counted c ON c.id = a.id
+            WHERE a.id = :article_id
+            AND a.slug = :slug
+            """
+        ).bindparams(article_id=ids[0], slug=slug, curr_user_id=curr_user_id)
+    ).fetchone()
+
+    _ARTICLE_CACHE.delete(ids[0])
+    if not article:
+        _SLUG_CACHE.delete(slug)
+        return None
+
+    # only (tag, author, favorited) counts filtered on this user's favorites
+    # can have moved
+    _ARTICLES_COUNT_CACHE.delete_where(
+        lambda cache_key: len(cache_key) == 3
+        and cache_key[2] == article.favoriter_username
+    )
+    _bump_favorites_version()
+    return _article_from_row(
+        article,
+        tag_list=article.tag_list,
+        favorited=favorited,
+        following=article.following,
     )
-    return get_article_by_slug(db_conn, slug, curr_user_id)
+
+
+def add_article_favorite(
+    db_conn: Connection, slug: str, curr_user_id: str
+) -> typ.Optional[Article]:
+    return set_article_favorite(db_conn, slug, curr_user_id, favorited=True)
 
 
 def delete_article_favorite(
     db_conn: Connection, slug: str, curr_user_id: str
 ) -> typ.Optional[Article]:
-    db_conn.execute(
+    return set_article_favorite(db_conn, slug, curr_user_id, favorited=False)
+
+
+def reconcile_favorites_counts(db_conn: Connection) -> int:
+    """Recompute drifted `articles.favorites_count` values, returns rows fixed."""
+    fixed = db_conn.execute(
         satext(
             """
-            DELETE FROM article_favorites
-            WHERE article_id = (
-                SELECT id
-                FROM articles
-                WHERE slug = :slug
-            )
-            AND user_id = :user_id
+            UPDATE articles a
+            SET favorites_count = actual.favorites_count
+            FROM (
+                SELECT a.id, COUNT(f.article_id) AS favorites_count
+                FROM articles a
+                LEFT JOIN article_favorites f ON f.article_id = a.id
+                GROUP BY a.id
+            ) actual
+            WHERE actual.id = a.id
+            AND a.favorites_count <> actual.favorites_count
+            RETURNING a.id
+            """
+        )
+    ).fetchall()
+    for row in fixed:
+        _ARTICLE_CACHE.delete(str(row.id))
+    if fixed:
+        _bump_articles_version()
+    return len(fixed)
+
+
+def reconcile_comments_counts(db_conn: Connection) -> int:
+    """Recompute drifted `articles.comments_count` values, returns rows fixed."""
+    fixed = db_conn.execute(
+        satext(
+            """
+            UPDATE articles a
+            SET comments_count = actual.comments_count
+            FROM (
+                SELECT a.id, COUNT(ac.id) AS comments_count
+                FROM articles a
+                LEFT JOIN article_comments ac ON ac.article_id = a.id
+                GROUP BY a.id
+            ) actual
+            WHERE actual.id = a.id
+            AND a.comments_count <> actual.comments_count
+            RETURNING a.id
             """
-        ).bindparams(slug=slug, user_id=curr_user_id)
+        )
+    ).fetchall()
+    for row in fixed:
+        _ARTICLE_CACHE.delete(str(row.id))
+    if fixed:
+        _bump_articles_version()
+    return len(fixed)
+
+
+def reconcile_tag_counts(db_conn: Connection) -> int:
+    """Recompute drifted `tags.articles_count` values, returns rows fixed."""
+    result = db_conn.execute(
+        satext(
+            """
+            UPDATE tags t
+            SET articles_count = actual.articles_count
+            FROM (
+                SELECT t.id, COUNT(at.article_id) AS articles_count
+                FROM tags t
+                LEFT JOIN article_tags at ON at.tag_id = t.id
+                GROUP BY t.id
+            ) actual
+            WHERE actual.id = t.id
+            AND t.articles_count <> actual.articles_count
+            """
+        )
     )
-    return get_article_by_slug(db_conn, slug, curr_user_id)
+    return result.rowcount
 
 
-def get_all_tags(db_conn: Connection) -> typ.List[str]:
-    result = db_conn.execute(satext("SELECT * from tags")).fetchall()
-    return [tag.name for tag in result]
+def get_popular_tags(
+    db_conn: Connection, limit: int = 20, offset: int = 0
+) -> typ.List[typ.Tuple[str, int]]:
+    """Tags in use ordered by how many articles carry them, most popular first."""
+    result = db_conn.execute(
+        satext(
+            """
+            SELECT name, articles_count
+            FROM tags
+            WHERE articles_count > 0
+            ORDER BY articles_count DESC, name
+            LIMIT :limit
+            OFFSET :offset
+            """
+        ).bindparams(limit=limit, offset=offset)
+    ).fetchall()
+    return [(tag.name, tag.articles_count) for tag in result]
@@ -1,5 +1,10 @@
 import typing as typ
-from realworld.api.core.models import BaseCamelModel, Article, Comment
+from realworld.api.core.models import (
+    BaseCamelModel,
+    Article,
+    ArticlePreview,
+    Comment,
+)
 
 
 # GET /api/articles
@@ -50,14 +55,17 @@ class SingleArticleResponse(BaseCamelModel):
 
 
 class MultipleArticlesResponse(BaseCamelModel):
-    articles: typ.List[Article]
+    articles: typ.List[typ.Union[Article, ArticlePreview]]
     articles_count: int
+    next_cursor: typ.Optional[str] = None
 
 
 class MultipleCommentsResponse(BaseCamelModel):
     comments: typ.List[Comment]
+    next_cursor: typ.Optional[str] = None
 
 
 # GET /api/tags
 class GetTagsResponse(BaseCamelModel):
     tags: list[str]
+    tag_counts: typ.Dict[str, int]
@@ -1,5 +1,24 @@
-from flask import Blueprint, request
+import os
+import time
+import typing as typ
+from flask import Blueprint, Response, request
+from realworld.api.core.cache import LRUCache
+from realworld.api.core.compression import EncodedBody, encoded_response
+from realworld.api.core.conditional import make_etag, not_modified, with_validators
 from realworld.api.core.db import get_db_connection
+from realworld.api.core.pagination import (
+    MAX_PAGE_LIMIT,
+    parse_limit,
+    parse_offset,
+)
+from realworld.api.core.serialization import (
+    MAX_BATCH_SIZE,
+    parse_list_arg,
+    parse_request,
+    json_response,
+    stream_json_list,
+    stream_json_response,
+)
 import realworld.api.routes.v1.articles.handler as articles_handler
 from realworld.api.core.auth import validate_token, get_user_id_from_token
 from realworld.api.routes.v1.articles.models import (
@@ -19,33 +38,181 @@ from realworld.api.routes.v1.articles.models import (
 articles_blueprint = Blueprint("articles_endpoints", __name__)
 tags_blueprint = Blueprint("tags_endpoints", __name__, url_prefix="/tags")
 
+TAGS_CACHE_TTL = float(os.getenv("TAGS_CACHE_TTL", "60"))
+ARTICLES_PAGE_CACHE_TTL = float(os.getenv("ARTICLES_PAGE_CACHE_TTL", "10"))
+# how long a cached page may keep serving favorites counts a favorite moved on
+ARTICLES_PAGE_FAVORITES_TTL = float(os.getenv("ARTICLES_PAGE_FAVORITES_TTL", "2"))
+
+# articles and comments asked for with a larger limit are streamed
+STREAM_MIN_LIMIT = int(os.getenv("STREAM_MIN_LIMIT", "100"))
+
+# (tags version, limit, offset) -> (GET /api/tags response body, etag)
+_TAGS_RESPONSE_CACHE = LRUCache(maxsize=256, ttl=TAGS_CACHE_TTL)
+
+# (articles version, favorites version of favorited filters, query string)
+# -> (anonymous GET /api/articles page body, etag, favorites version, built at)
+_ARTICLES_PAGE_CACHE = LRUCache(maxsize=1024, ttl=ARTICLES_PAGE_CACHE_TTL)
+
+
+def _conditional_response(body: EncodedBody, etag: str) -> Response:
+    if response := not_modified(etag):
+        return response
+    return with_validators(encoded_response(body), etag)
+
+
+# list endpoints omit article bodies unless asked for with ?includeBody=true
+def _include_body() -> bool:
+    return request.args.get("includeBody", "false").lower() == "true"
+
+
+def _cached_articles_page(
+    cache_key: tuple, favorites_version: int
+) -> typ.Optional[typ.Tuple[EncodedBody, str]]:
+    if (cached := _ARTICLES_PAGE_CACHE.get(cache_key)) is None:
+        return None
+
+    # favorites only move counts here, so pages built before one are served
+    # a little longer rather than rebuilt on every favorite
+    body, etag, built_favorites_version, built_at = cached
+    if (
+        built_favorites_version != favorites_version
+        and time.monotonic() - built_at > ARTICLES_PAGE_FAVORITES_TTL
+    ):
+        return None
+    return body, etag
+
+
+def _articles_response(
+    articles, articles_count, next_cursor, cache_key=None, favorites_version=None
+) -> Response:
+    # a page is only known once it is queried, but its validators are built from
+    # the fields a listed article can change in rather than the encoded body
+    etag = make_etag(
+        articles_count,
+        next_cursor,
+        [
+            (
+                article.slug,
+                article.updated_at,
+                article.favorites_count,
+                article.comments_count,
+                article.favorited,
+                article.author.username,
+                article.author.bio,
+                article.author.image,
+                article.author.following,
+            )
+            for article in articles
+        ],
+    )
+    if response := not_modified(etag):
+        return response
+
+    body = EncodedBody(
+        MultipleArticlesResponse(
+            articles=articles,
+            articles_count=articles_count,
+            next_cursor=next_cursor,
+        )
+        .model_dump_json()
+        .encode("utf-8")
+    )
+    if cache_key:
+        _ARTICLES_PAGE_CACHE.set(
+            cache_key, (body, etag, favorites_version, time.monotonic())
+        )
+    return with_validators(encoded_response(body), etag)
+
+
+def _stream_articles(filters: dict, **kwargs) -> typ.Iterator[bytes]:
+    # the connection is held until the last chunk is sent
+    with get_db_connection() as db_conn:
+        articles_count = articles_handler.count_articles(db_conn, **filters)
+        yield from stream_json_list(
+            "articles",
+            articles_handler.stream_articles(db_conn, **filters, **kwargs),
+            lambda next_cursor: MultipleArticlesResponse(
+                articles=[], articles_count=articles_count, next_cursor=next_cursor
+            ),
+        )
+
+
+def _stream_comments(slug: str, **kwargs) -> typ.Iterator[bytes]:
+    with get_db_connection() as db_conn:
+        yield from stream_json_list(
+            "comments",
+            articles_handler.stream_article_comments(db_conn, slug, **kwargs),
+            lambda next_cursor: MultipleCommentsResponse(
+                comments=[], next_cursor=next_cursor
+            ),
+        )
+
 
 @articles_blueprint.route("/articles", methods=["GET"])
-def get_articles() -> dict:
+def get_articles() -> Response:
     """
-    Returns most recent articles globally by default, provide tag, author or favorited query parameter to filter results
+    Returns most recent articles globally by default, provide tag, author or favorited query parameter to filter results.
+    Pass the returned `nextCursor` as `cursor` to page with a constant cost keyset instead of `offset`.
+    Anonymous pages are cached per worker with their compressed variants until an article changes.
+    Pages over `STREAM_MIN_LIMIT` articles are streamed instead, uncached and without validators.
+    `?slugs=a,b,c` is a batch lookup instead, returning the known articles in request order.
     """
     user_id = get_user_id_from_token()
+    slugs = parse_list_arg("slugs")
+    if slugs and len(slugs) > MAX_BATCH_SIZE:
+        return {"message": f"At most {MAX_BATCH_SIZE} slugs per request"}, 400
+
+    # larger pages are streamed rather than clamped
+    limit = parse_limit(request.args.get("limit"))
+    filters = {
+        "filter_tag": request.args.get("tag"),
+        "author_username_filter": request.args.get("author"),
+        "favorited_by_username_filter": request.args.get("favorited"),
+    }
+    page = {
+        "curr_user_id": user_id,
+        "limit": limit,
+        "offset": parse_offset(request.args.get("offset")),
+        "cursor": request.args.get("cursor"),
+        "include_body": _include_body(),
+    }
+    if slugs is None and limit > STREAM_MIN_LIMIT:
+        return stream_json_response(_stream_articles(filters, **page))
+
+    cache_key, favorites_version = None, None
+    if not user_id:
+        # favorited filters list different articles after a favorite
+        favorites_version = articles_handler.get_favorites_version()
+        cache_key = (
+            articles_handler.get_articles_version(),
+            favorites_version if filters["favorited_by_username_filter"] else None,
+            request.query_string,
+        )
+        if cached := _cached_articles_page(cache_key, favorites_version):
+            return _conditional_response(*cached)
+
     with get_db_connection() as db_conn:
-        articles = articles_handler.get_articles(
-            db_conn,
-            curr_user_id=user_id,
-            filter_tag=request.args.get("tag"),
-            author_username_filter=request.args.get("author"),
-            favorited_by_username_filter=request.args.get("favorited"),
-            limit=int(request.args.get("limit", 20)),
-            offset=int(request.args.get("offset", 0)),
+        if slugs is not None:
+            articles = articles_handler.get_articles_by_slugs(
+                db_conn, slugs, user_id, include_body=page["include_body"]
+            )
+            return _articles_response(
+                articles, len(articles), None, cache_key, favorites_version
+            )
+
+        articles, next_cursor = articles_handler.get_articles(
+            db_conn, **page, **filters
         )
+        articles_count = articles_handler.count_articles(db_conn, **filters)
 
-    return MultipleArticlesResponse(
-        articles=articles,
-        articles_count=len(articles),
-    ).model_dump()
+    return _articles_response(
+        articles, articles_count, next_cursor, cache_key, favorites_version
+    )
 
 
 @validate_token
 @articles_blueprint.route("/articles/feed", methods=["GET"])
-def get_feed() -> dict:
+def get_feed() -> Response:
     """
     Returns articles created by followed users, ordered by most recent first.
     """
@@ -53,55 +220,94 @@ def get_feed() -> dict:
         return {"message": "Invalid token"}, 401
 
     with get_db_connection() as db_conn:
-        articles = articles_handler.get_feed_articles(
+        articles, next_cursor = articles_handler.get_feed_articles(
             db_conn,
             user_id,
-            limit=int(request.args.get("limit", 20)),
-            offset=int(request.args.get("offset", 0)),
+            limit=parse_limit(request.args.get("limit"), maximum=MAX_PAGE_LIMIT),
+            offset=parse_offset(request.args.get("offset")),
+            cursor=request.args.get("cursor"),
+            include_body=_include_body(),
+        )
+        articles_count = articles_handler.count_articles(
+            db_conn, curr_user_id=user_id, curr_user_feed=True
         )
 
-    return MultipleArticlesResponse(
-        articles=articles,
-        articles_count=len(articles),
-    ).model_dump()
+    return _articles_response(articles, articles_count, next_cursor)
+
+
+@articles_blueprint.route("/articles/search", methods=["GET"])
+def search_articles() -> Response:
+    """
+    Full-text search over article title, description and body, best matches first.
+    """
+    if not (query := request.args.get("q", "").strip()):
+        return {"message": "Missing search query"}, 400
+
+    with get_db_connection() as db_conn:
+        articles, next_cursor, articles_count = articles_handler.search_articles(
+            db_conn,
+            query,
+            curr_user_id=get_user_id_from_token(),
+            limit=parse_limit(request.args.get("limit"), maximum=MAX_PAGE_LIMIT),
+            offset=parse_offset(request.args.get("offset")),
+            cursor=request.args.get("cursor"),
+            include_body=_include_body(),
+        )
+
+    return _articles_response(articles, articles_count, next_cursor)
 
 
 @articles_blueprint.route("/articles/<string:slug>", methods=["GET"])
-def get_article(slug: str) -> dict:
+def get_article(slug: str) -> Response:
+    """
+    Answers `If-None-Match` with a 304 before the article is hydrated.
+    No `Last-Modified` is sent: counters and viewer flags have no timestamp, so
+    `If-Modified-Since` could confirm a body with a stale count or flag.
+    """
+    user_id = get_user_id_from_token()
     with get_db_connection() as db_conn:
+        if not (
+            version := articles_handler.get_article_version(db_conn, slug, user_id)
+        ):
+            return {"message": "Article not found"}, 404
+
+        etag = make_etag(*version)
+        if response := not_modified(etag):
+            return response
+
         article = articles_handler.get_article_by_slug(
-            db_conn, slug, curr_user_id=get_user_id_from_token()
+            db_conn, slug, curr_user_id=user_id, version=version
         )
         if not article:
             return {"message": "Article not found"}, 404
 
-    return SingleArticleResponse(article=article).model_dump()
+    return with_validators(json_response(SingleArticleResponse(article=article)), etag)
 
 
 @articles_blueprint.route("/articles", methods=["POST"])
-def create_article() -> dict:
+def create_article() -> Response:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
 
-    data = CreateArticleRequest.model_validate(request.json)
+    data = parse_request(CreateArticleRequest)
     with get_db_connection() as db_conn:
         article = articles_handler.create_article(db_conn, user_id, data.article)
 
-    return SingleArticleResponse(article=article).model_dump()
+    return json_response(SingleArticleResponse(article=article))
 
 
 @articles_blueprint.route("/articles/<string:slug>", methods=["PUT"])
-def update_article(slug) -> dict:
+def update_article(slug) -> Response:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
 
-    data = UpdateArticleRequest.model_validate(request.json)
+    data = parse_request(UpdateArticleRequest)
     with get_db_connection() as db_conn:
         article = articles_handler.update_article(db_conn, slug, user_id, data.article)
         if not article:
             return {"message": "Article not found"}, 404
 
-    return SingleArticleResponse(article=article).model_dump()
+    return json_response(SingleArticleResponse(article=article))
 
 
 @articles_blueprint.route("/articles/<string:slug>", methods=["DELETE"])
@@ -120,11 +326,11 @@ def delete_article(slug: str) -> dict:
 # Comments
 #
 @articles_blueprint.route("/articles/<string:slug>/comments", methods=["POST"])
-def create_comment(slug: str) -> dict:
+def create_comment(slug: str) -> Response:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
 
-    data = CreateCommentRequest.model_validate(request.json)
+    data = parse_request(CreateCommentRequest)
 
     with get_db_connection() as db_conn:
         does_article_exist, comment = articles_handler.create_article_comment(
@@ -133,17 +339,55 @@ def create_comment(slug: str) -> dict:
         if not does_article_exist:
             return {"message": "Article not found"}, 404
 
-    return CreateCommentResponse(comment=comment).model_dump()
+    return json_response(CreateCommentResponse(comment=comment))
 
 
 @articles_blueprint.route("/articles/<string:slug>/comments", methods=["GET"])
-def get_comments(slug: str) -> dict:
+def get_comments(slug: str) -> Response:
+    """
+    Returns an article's comments oldest first, `limit` at a time.
+    Pass the returned `nextCursor` as `cursor` to read the next page.
+    Threads read over `STREAM_MIN_LIMIT` comments at a time are streamed, without validators.
+    """
+    page = {
+        "curr_user_id": get_user_id_from_token(),
+        "limit": parse_limit(request.args.get("limit")),
+        "cursor": request.args.get("cursor"),
+    }
+    if page["limit"] > STREAM_MIN_LIMIT:
+        return stream_json_response(_stream_comments(slug, **page))
+
     with get_db_connection() as db_conn:
-        comments = articles_handler.get_article_comments(
-            db_conn, slug, curr_user_id=get_user_id_from_token()
+        comments, next_cursor = articles_handler.get_article_comments(
+            db_conn, slug, **page
         )
 
-    return MultipleCommentsResponse(comments=comments).model_dump()
+    # the page is a bounded index range scan with one follow lookup per row,
+    # cheaper than any validator covering the whole thread, so the ETag is
+    # built from what the page shows
+    etag = make_etag(
+        next_cursor,
+        [
+            (
+                comment.id,
+                comment.updated_at,
+                comment.author.username,
+                comment.author.bio,
+                comment.author.image,
+                comment.author.following,
+            )
+            for comment in comments
+        ],
+    )
+    if response := not_modified(etag):
+        return response
+
+    return with_validators(
+        json_response(
+            MultipleCommentsResponse(comments=comments, next_cursor=next_cursor)
+        ),
+        etag,
+    )
 
 
 @articles_blueprint.route(
@@ -163,7 +407,7 @@ def delete_comment(slug: str, comment_id: str) -> dict:
 # Favorites
 #
 @articles_blueprint.route("/articles/<string:slug>/favorite", methods=["POST"])
-def favorite_article(slug: str) -> dict:
+def favorite_article(slug: str) -> Response:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
 
@@ -172,11 +416,11 @@ def favorite_article(slug: str) -> dict:
         if not article:
             return {"message": "Article not found"}, 404
 
-    return SingleArticleResponse(article=article).model_dump()
+    return json_response(SingleArticleResponse(article=article))
 
 
 @articles_blueprint.route("/articles/<string:slug>/favorite", methods=["DELETE"])
-def unfavorite_article(slug: str) -> dict:
+def unfavorite_article(slug: str) -> Response:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
 
@@ -185,15 +429,36 @@ def unfavorite_article(slug: str) -> dict:
         if not article:
             return {"message": "Article not found"}, 404
 
-    return SingleArticleResponse(article=article).model_dump()
+    return json_response(SingleArticleResponse(article=article))
 
 
 #
 # Tags
 #
 @tags_blueprint.route("", methods=["GET"])
-def get_tags() -> dict:
-    with get_db_connection() as db_conn:
-        tags = articles_handler.get_all_tags(db_conn)
+def get_tags() -> Response:
+    """
+    Returns the most popular tags first, with the number of articles using each tag.
+    Responses are cached per worker as encoded bytes, along with their compressed
+    variants, until the set of tags changes.
+    """
+    limit = parse_limit(request.args.get("limit"), maximum=MAX_PAGE_LIMIT)
+    offset = parse_offset(request.args.get("offset"))
+    cache_key = (articles_handler.get_tags_version(), limit, offset)
+
+    if (cached := _TAGS_RESPONSE_CACHE.get(cache_key)) is None:
+        with get_db_connection() as db_conn:
+            tags = articles_handler.get_popular_tags(
+                db_conn, limit=limit, offset=offset
+            )
+
+        body = (
+            GetTagsResponse(tags=[name for name, _ in tags], tag_counts=dict(tags))
+            .model_dump_json()
+            .encode("utf-8")
+        )
+        # hashed once per cache fill rather than per request
+        cached = (EncodedBody(body), make_etag(body))
+        _TAGS_RESPONSE_CACHE.set(cache_key, cached)
 
-    return GetTagsResponse(tags=tags).model_dump()
+    return _conditional_response(*cached)
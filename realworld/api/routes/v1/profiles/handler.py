@@ -1,12 +1,21 @@
 import typing as typ
 from sqlalchemy.engine import Connection
 from sqlalchemy.sql import text as satext
+from realworld.api.core import feed
 from realworld.api.routes.v1.profiles.models import ProfileData
 
 
-def get_profile(
-    db_conn: Connection, username: str, curr_user_id: typ.Optional[str] = None
-) -> typ.Optional[ProfileData]:
+def get_profiles(
+    db_conn: Connection,
+    usernames: typ.Sequence[str],
+    curr_user_id: typ.Optional[str] = None,
+) -> typ.List[ProfileData]:
+    """
+    Look up many profiles in one set query, in the order of `usernames`.
+    Unknown usernames are left out.
+    """
+    if not usernames:
+        return []
 
     result = db_conn.execute(
         satext(
@@ -24,51 +33,142 @@ def get_profile(
                 FROM user_follows
                 WHERE user_id = :curr_user_id
             ) uf ON u.id = uf.following_user_id
-            WHERE username = :username
+            WHERE username = ANY(CAST(:usernames AS text[]))
             """
-        ).bindparams(username=username, curr_user_id=curr_user_id)
-    ).fetchone()
-
-    if not result:
-        return None
+        ).bindparams(usernames=list(usernames), curr_user_id=curr_user_id)
+    ).fetchall()
 
-    return ProfileData(
-        username=result.username,
-        bio=result.bio,
-        image=result.image_url,
-        following=result.following,
-    )
+    positions = {username: position for position, username in enumerate(usernames)}
+    return [
+        ProfileData(
+            username=row.username,
+            bio=row.bio,
+            image=row.image_url,
+            following=row.following,
+        )
+        for row in sorted(result, key=lambda row: positions[row.username])
+    ]
 
 
-def follow_profile(
+def get_profile(
     db_conn: Connection, username: str, curr_user_id: typ.Optional[str] = None
 ) -> typ.Optional[ProfileData]:
-    db_conn.execute(
+    profiles = get_profiles(db_conn, [username], curr_user_id)
+    return profiles[0] if profiles else None
+
+
+def follow_profiles(
+    db_conn: Connection, usernames: typ.Sequence[str], curr_user_id: str
+) -> typ.List[ProfileData]:
+    """
+    Follow many profiles with one set insert and a single timeline backfill,
+    then return them in the order of `usernames`.
+    """
+    if not usernames:
+        return []
+
+    # followers_count only moves when a follow row was actually inserted, the
+    # follow that brings an author to the fan-out limit marks them pulled
+    followed = db_conn.execute(
         satext(
             """
-            INSERT INTO user_follows (user_id, following_user_id)
-            SELECT :curr_user_id, u.id
-            FROM users u
-            WHERE u.username = :username
-            ON CONFLICT (user_id, following_user_id) DO NOTHING
-           """
-        ).bindparams(username=username, curr_user_id=curr_user_id)
-    )
+            WITH followed AS (
+                INSERT INTO user_follows (user_id, following_user_id)
+                SELECT :curr_user_id, u.id
+                FROM users u
+                WHERE u.username = ANY(CAST(:usernames AS text[]))
+                AND u.id <> :curr_user_id  -- unable to follow yourself
+                ON CONFLICT (user_id, following_user_id) DO NOTHING
+                RETURNING following_user_id
+            )
+            UPDATE users
+            SET
+                followers_count = followers_count + 1,
+                feed_pulled = feed_pulled OR followers_count + 1 >= :fanout_limit
+            WHERE id IN (SELECT following_user_id FROM followed)
+            RETURNING id
+            """
+        ).bindparams(
+            usernames=list(usernames),
+            curr_user_id=curr_user_id,
+            fanout_limit=feed.FEED_FANOUT_FOLLOWER_LIMIT,
+        )
+    ).fetchall()
+    feed.backfill_feed(db_conn, curr_user_id, [row.id for row in followed])
+
+    return get_profiles(db_conn, usernames, curr_user_id)
+
 
-    return get_profile(db_conn, username, curr_user_id)
+def unfollow_profiles(
+    db_conn: Connection, usernames: typ.Sequence[str], curr_user_id: str
+) -> typ.List[ProfileData]:
+    """
+    Unfollow many profiles with one set delete and a single timeline trim,
+    then return them in the order of `usernames`.
+    """
+    if not usernames:
+        return []
+
+    # followers_count only moves when a follow row was actually deleted, an
+    # author pulled into feeds stays pulled when that takes them below the
+    # fan-out limit
+    unfollowed = db_conn.execute(
+        satext(
+            """
+            WITH unfollowed AS (
+                DELETE FROM user_follows
+                WHERE user_id = :curr_user_id
+                AND following_user_id IN (
+                    SELECT id
+                    FROM users
+                    WHERE username = ANY(CAST(:usernames AS text[]))
+                )
+                RETURNING following_user_id
+            )
+            UPDATE users
+            SET followers_count = followers_count - 1
+            WHERE id IN (SELECT following_user_id FROM unfollowed)
+            RETURNING id
+            """
+        ).bindparams(usernames=list(usernames), curr_user_id=curr_user_id)
+    ).fetchall()
+    feed.trim_feed(db_conn, curr_user_id, [row.id for row in unfollowed])
+
+    return get_profiles(db_conn, usernames, curr_user_id)
+
+
+def follow_profile(
+    db_conn: Connection, username: str, curr_user_id: typ.Optional[str] = None
+) -> typ.Optional[ProfileData]:
+    profiles = follow_profiles(db_conn, [username], curr_user_id)
+    return profiles[0] if profiles else None
 
 
 def unfollow_profile(
     db_conn: Connection, username: str, curr_user_id: typ.Optional[str] = None
 ) -> typ.Optional[ProfileData]:
-    db_conn.execute(
+    profiles = unfollow_profiles(db_conn, [username], curr_user_id)
+    return profiles[0] if profiles else None
+
+
+def reconcile_followers_counts(db_conn: Connection) -> int:
+    """Recompute drifted `users.followers_count` values, returns rows fixed."""
+    result = db_conn.execute(
         satext(
             """
-            DELETE FROM user_follows
-            WHERE user_id = :curr_user_id
-            AND following_user_id = (SELECT id FROM users WHERE username = :username)
+            UPDATE users u
+            SET
+                followers_count = actual.followers_count,
+                feed_pulled = u.feed_pulled OR actual.followers_count >= :fanout_limit
+            FROM (
+                SELECT u.id, COUNT(uf.user_id) AS followers_count
+                FROM users u
+                LEFT JOIN user_follows uf ON uf.following_user_id = u.id
+                GROUP BY u.id
+            ) actual
+            WHERE actual.id = u.id
+            AND u.followers_count <> actual.followers_count
             """
-        ).bindparams(username=username, curr_user_id=curr_user_id)
+        ).bindparams(fanout_limit=feed.FEED_FANOUT_FOLLOWER_LIMIT)
     )
-
-    return get_profile(db_conn, username, curr_user_id)
+    return result.rowcount
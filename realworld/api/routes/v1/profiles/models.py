@@ -9,5 +9,14 @@ class ProfileData(BaseCamelModel):
     image: typ.Optional[str] = None
 
 
+# POST / DELETE /api/profiles/follow
+class BulkFollowRequest(BaseCamelModel):
+    usernames: typ.List[str]
+
+
 class ProfileDataResponse(BaseCamelModel):
     profile: ProfileData
+
+
+class MultipleProfilesResponse(BaseCamelModel):
+    profiles: typ.List[ProfileData]
@@ -1,14 +1,55 @@
-from flask import Blueprint
+from flask import Blueprint, Response
 from realworld.api.core.db import get_db_connection
+from realworld.api.core.conditional import make_etag, not_modified, with_validators
+from realworld.api.core.serialization import (
+    MAX_BATCH_SIZE,
+    json_response,
+    parse_list_arg,
+    parse_request,
+)
 from realworld.api.core.auth import validate_token, get_user_id_from_token
-from realworld.api.routes.v1.profiles.models import ProfileDataResponse, ProfileData
+from realworld.api.routes.v1.profiles.models import (
+    ProfileDataResponse,
+    ProfileData,
+    MultipleProfilesResponse,
+    BulkFollowRequest,
+)
 import realworld.api.routes.v1.profiles.handler as profiles_handler
 
 profiles_blueprint = Blueprint("profiles_endpoints", __name__, url_prefix="/profiles")
 
 
+@profiles_blueprint.route("", methods=["GET"])
+def get_profiles() -> Response:
+    """
+    Batch lookup, `?usernames=x,y` returns the known profiles in request order.
+    """
+    if (usernames := parse_list_arg("usernames")) is None:
+        return {"message": "Missing usernames"}, 400
+    if len(usernames) > MAX_BATCH_SIZE:
+        return {"message": f"At most {MAX_BATCH_SIZE} usernames per request"}, 400
+
+    with get_db_connection() as db_conn:
+        profiles = profiles_handler.get_profiles(
+            db_conn, usernames, get_user_id_from_token()
+        )
+
+    etag = make_etag(
+        [
+            (profile.username, profile.bio, profile.image, profile.following)
+            for profile in profiles
+        ]
+    )
+    if response := not_modified(etag):
+        return response
+
+    return with_validators(
+        json_response(MultipleProfilesResponse(profiles=profiles)), etag
+    )
+
+
 @profiles_blueprint.route("/<string:username>", methods=["GET"])
-def get_profile(username) -> dict:
+def get_profile(username) -> Response:
 
     with get_db_connection() as db_conn:
         if not (
@@ -18,19 +59,29 @@ def get_profile(username) -> dict:
         ):
             return {"error": "Profile not found."}, 404
 
-    return ProfileDataResponse(
-        profile=ProfileData(
-            username=profile.username,
-            bio=profile.bio,
-            image=profile.image,
-            following=profile.following,
-        )
-    ).model_dump()
+    # a profile is a single indexed row, its few fields are the cheapest validator
+    etag = make_etag(profile.username, profile.bio, profile.image, profile.following)
+    if response := not_modified(etag):
+        return response
+
+    return with_validators(
+        json_response(
+            ProfileDataResponse(
+                profile=ProfileData(
+                    username=profile.username,
+                    bio=profile.bio,
+                    image=profile.image,
+                    following=profile.following,
+                )
+            )
+        ),
+        etag,
+    )
 
 
 @validate_token
 @profiles_blueprint.route("/<string:username>/follow", methods=["POST"])
-def follow_profile(username):
+def follow_profile(username) -> Response:
 
     with get_db_connection() as db_conn:
         if not (
@@ -40,19 +91,21 @@ def follow_profile(username):
         ):
             return {"error": "Profile not found."}, 404
 
-    return ProfileDataResponse(
-        profile=ProfileData(
-            username=profile.username,
-            bio=profile.bio,
-            image=profile.image,
-            following=profile.following,
+    return json_response(
+        ProfileDataResponse(
+            profile=ProfileData(
+                username=profile.username,
+                bio=profile.bio,
+                image=profile.image,
+                following=profile.following,
+            )
         )
-    ).model_dump()
+    )
 
 
 @validate_token
 @profiles_blueprint.route("/<string:username>/follow", methods=["DELETE"])
-def unfollow_profile(username):
+def unfollow_profile(username) -> Response:
 
     with get_db_connection() as db_conn:
         if not (
@@ -62,11 +115,47 @@ def unfollow_profile(username):
         ):
             return {"error": "Profile not found."}, 404
 
-    return ProfileDataResponse(
-        profile=ProfileData(
-            username=profile.username,
-            bio=profile.bio,
-            image=profile.image,
-            following=profile.following,
+    return json_response(
+        ProfileDataResponse(
+            profile=ProfileData(
+                username=profile.username,
+                bio=profile.bio,
+                image=profile.image,
+                following=profile.following,
+            )
         )
-    ).model_dump()
+    )
+
+
+def _bulk_follow(set_follows) -> Response:
+    if not (user_id := get_user_id_from_token()):
+        return {"message": "Invalid token"}, 401
+
+    usernames = list(dict.fromkeys(parse_request(BulkFollowRequest).usernames))
+    if len(usernames) > MAX_BATCH_SIZE:
+        return {"message": f"At most {MAX_BATCH_SIZE} usernames per request"}, 400
+
+    with get_db_connection() as db_conn:
+        profiles = set_follows(db_conn, usernames, user_id)
+
+    return json_response(MultipleProfilesResponse(profiles=profiles))
+
+
+@validate_token
+@profiles_blueprint.route("/follow", methods=["POST"])
+def follow_profiles() -> Response:
+    """
+    Follow every profile in `{"usernames": [...]}` at once, returns the known
+    profiles in request order.
+    """
+    return _bulk_follow(profiles_handler.follow_profiles)
+
+
+@validate_token
+@profiles_blueprint.route("/follow", methods=["DELETE"])
+def unfollow_profiles() -> Response:
+    """
+    Unfollow every profile in `{"usernames": [...]}` at once, returns the known
+    profiles in request order.
+    """
+    return _bulk_follow(profiles_handler.unfollow_profiles)
@@ -92,7 +92,7 @@ def validate_user_creds(
             """
             SELECT id, username, email, password_hash, bio, image_url
             FROM users
-            WHERE email = :email
+            WHERE lower(email) = lower(:email)
             """
         ).bindparams(email=email)
     ).fetchone()
@@ -1,6 +1,15 @@
+import json
+import click
 from flask import Flask, jsonify
 from flask_cors import CORS
 from pydantic import ValidationError
+from realworld.api.core import feed
+from realworld.api.core.compression import compress_response
+from realworld.api.core.db import get_db_connection
+from realworld.api.core.pagination import InvalidCursorError, InvalidLimitError
+from realworld.api.core.serialization import MAX_REQUEST_BODY_SIZE
+import realworld.api.routes.v1.articles.handler as articles_handler
+import realworld.api.routes.v1.profiles.handler as profiles_handler
 from realworld.api.routes.v1.users.routes import users_blueprint
 from realworld.api.routes.v1.profiles.routes import profiles_blueprint
 from realworld.api.routes.v1.articles.routes import articles_blueprint, tags_blueprint
@@ -8,9 +17,12 @@ from realworld.api.routes.v1.articles.routes import articles_blueprint, tags_blu
 
 def create_app() -> Flask:
     app = Flask(__name__)
+    app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BODY_SIZE
     CORS(app)
+    app.after_request(compress_response)
     _register_blueprints(app)
     _register_error_handlers(app)
+    _register_commands(app)
     return app
 
 
@@ -32,9 +44,45 @@ def _register_blueprints(app: Flask):
 def _register_error_handlers(app: Flask):
     @app.errorhandler(ValidationError)
     def handle_validation_error(error):
-        response = jsonify({"error": "Validation error", "messages": error.errors()})
+        # `error.json()` also encodes raw request bytes echoed back as input
+        messages = json.loads(error.json())
+        response = jsonify({"error": "Validation error", "messages": messages})
         response.status_code = 422
         return response
 
+    @app.errorhandler(InvalidCursorError)
+    def handle_invalid_cursor_error(error):
+        response = jsonify({"error": "Invalid cursor", "messages": [str(error)]})
+        response.status_code = 400
+        return response
+
+    @app.errorhandler(InvalidLimitError)
+    def handle_invalid_limit_error(error):
+        response = jsonify({"error": "Invalid limit", "messages": [str(error)]})
+        response.status_code = 400
+        return response
+
+
+def _register_commands(app: Flask):
+    @app.cli.command("reconcile-counters")
+    def reconcile_counters():
+        """Recompute denormalized counters that drifted from their source rows."""
+        with get_db_connection() as db_conn:
+            favorites = articles_handler.reconcile_favorites_counts(db_conn)
+            comments = articles_handler.reconcile_comments_counts(db_conn)
+            followers = profiles_handler.reconcile_followers_counts(db_conn)
+            tags = articles_handler.reconcile_tag_counts(db_conn)
+        click.echo(f"favorites_count: reconciled {favorites} articles")
+        click.echo(f"comments_count: reconciled {comments} articles")
+        click.echo(f"followers_count: reconciled {followers} users")
+        click.echo(f"articles_count: reconciled {tags} tags")
+
+    @app.cli.command("rebuild-feeds")
+    def rebuild_feeds():
+        """Rebuild every user's feed timeline from follows and articles."""
+        with get_db_connection() as db_conn:
+            feed_items = feed.rebuild_feeds(db_conn)
+        click.echo(f"user_feed_items: rebuilt {feed_items} timeline entries")
+
 
 app = create_app()
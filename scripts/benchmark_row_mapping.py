@@ -0,0 +1,146 @@
+"""
+Compare building a page of articles / comments from DB rows with full pydantic
+validation against the trusted `construct_trusted` mappers used by the handlers.
+
+    PYTHONPATH=. poetry run python scripts/benchmark_row_mapping.py [--limit 100]
+"""
+
+import argparse
+import timeit
+from collections import namedtuple
+from datetime import datetime, timezone
+from uuid import uuid4
+from realworld.api.core.models import Article, Comment, Profile
+from realworld.api.routes.v1.articles.handler import (
+    _article_from_row,
+    _comment_from_row,
+)
+
+ArticleRow = namedtuple(
+    "ArticleRow",
+    "id slug title description body created_date updated_date favorites_count "
+    "comments_count "
+    "author_user_id author_username author_bio author_image",
+)
+CommentRow = namedtuple(
+    "CommentRow",
+    "id body created_date updated_date author_username author_bio author_image",
+)
+
+
+def make_rows(limit: int):
+    now = datetime.now(timezone.utc)
+    articles = [
+        ArticleRow(
+            id=uuid4(),
+            slug=f"article-{i}",
+            title=f"Article {i}",
+            description="A benchmark article.",
+            body="Lorem ipsum dolor sit amet. " * 40,
+            created_date=now,
+            updated_date=now,
+            favorites_count=i,
+            comments_count=i,
+            author_user_id=uuid4(),
+            author_username=f"author-{i}",
+            author_bio="Writes benchmark articles.",
+            author_image=None,
+        )
+        for i in range(limit)
+    ]
+    comments = [
+        CommentRow(
+            id=uuid4(),
+            body="A benchmark comment.",
+            created_date=now,
+            updated_date=now,
+            author_username=f"commenter-{i}",
+            author_bio=None,
+            author_image=None,
+        )
+        for i in range(limit)
+    ]
+    return articles, comments
+
+
+def validated_article(row) -> Article:
+    return Article(
+        slug=row.slug,
+        title=row.title,
+        description=row.description,
+        body=row.body,
+        tag_list=["benchmark", "pydantic"],
+        created_at=row.created_date,
+        updated_at=row.updated_date,
+        favorited=False,
+        favorites_count=row.favorites_count,
+        comments_count=row.comments_count,
+        author=Profile(
+            username=row.author_username,
+            following=False,
+            bio=row.author_bio,
+            image=row.author_image,
+        ),
+    )
+
+
+def trusted_article(row) -> Article:
+    return _article_from_row(
+        row, tag_list=["benchmark", "pydantic"], favorited=False, following=False
+    )
+
+
+def validated_comment(row) -> Comment:
+    return Comment(
+        id=str(row.id),
+        body=row.body,
+        created_at=row.created_date,
+        updated_at=row.updated_date,
+        author=Profile(
+            username=row.author_username,
+            following=False,
+            bio=row.author_bio,
+            image=row.author_image,
+        ),
+    )
+
+
+def trusted_comment(row) -> Comment:
+    return _comment_from_row(row, following=False)
+
+
+def per_row_us(build, rows, repeat: int) -> float:
+    seconds = min(
+        timeit.repeat(lambda: [build(row) for row in rows], number=repeat, repeat=5)
+    )
+    return seconds / repeat / len(rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    article_rows, comment_rows = make_rows(args.limit)
+    cases = [
+        ("article", article_rows, validated_article, trusted_article),
+        ("comment", comment_rows, validated_comment, trusted_comment),
+    ]
+
+    print(f"limit={args.limit}, repeat={args.repeat}, best of 5")
+    for name, rows, validated, trusted in cases:
+        # both paths must produce the same response bytes
+        assert [validated(row).model_dump_json() for row in rows] == [
+            trusted(row).model_dump_json() for row in rows
+        ]
+        validated_us = per_row_us(validated, rows, args.repeat)
+        trusted_us = per_row_us(trusted, rows, args.repeat)
+        print(
+            f"{name:>8}: validated {validated_us:6.2f} us/row, "
+            f"trusted {trusted_us:6.2f} us/row ({validated_us / trusted_us:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,16 @@
+import gzip
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+from pytest import mark
+from sqlalchemy import text as satext
+from realworld.api.core import feed
+from realworld.api.core.cache import RedisCache
+from realworld.api.core.models import Article, ArticlePreview, Comment, Profile
+import realworld.api.routes.v1.articles.handler as articles_handler
+import realworld.api.routes.v1.articles.routes as articles_routes
+from realworld.api.core import compression
 from realworld.api.core.auth import generate_jwt
 
 
@@ -19,12 +32,12 @@ def test_get_articles(client, add_user, add_article):
             "slug": article["slug"],
             "title": article["title"],
             "description": article["description"],
-            "body": article["body"],
             "tagList": article["tags"],
             "createdAt": article["created_date"],
             "updatedAt": article["updated_date"],
             "favorited": False,
             "favoritesCount": 0,
+            "commentsCount": 0,
             "author": {
                 "username": user["username"],
                 "bio": user["bio"],
@@ -34,6 +47,143 @@ def test_get_articles(client, add_user, add_article):
         }
 
 
+def test_get_articles_include_body(client, add_article):
+    article = add_article()
+
+    resp = client.get("/api/articles")
+    assert "body" not in resp.json["articles"][0]
+
+    resp = client.get("/api/articles?includeBody=true")
+    assert resp.json["articles"][0]["body"] == article["body"]
+
+
+def test_get_articles_cursor_pagination(client, add_user, add_article):
+    user = add_user()
+    articles = [add_article(author_user_id=user["id"]) for _ in range(5)]
+    expected = [article["slug"] for article in reversed(articles)]
+
+    slugs, cursor = [], None
+    for _ in range(3):
+        query = "/api/articles?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        resp = client.get(query)
+        assert resp.status_code == 200
+        slugs.extend(article["slug"] for article in resp.json["articles"])
+        if not (cursor := resp.json["nextCursor"]):
+            break
+
+    assert slugs == expected
+    assert cursor is None
+
+
+@mark.parametrize("estimate_threshold", [0, 1])
+def test_get_articles_count_is_total(
+    estimate_threshold, monkeypatch, client, add_user, add_article
+):
+    monkeypatch.setattr(
+        articles_handler, "ARTICLES_COUNT_ESTIMATE_THRESHOLD", estimate_threshold
+    )
+    user = add_user()
+    for tags in (["mock"], ["mock"], ["other"]):
+        add_article(author_user_id=user["id"], tags=tags)
+
+    resp = client.get("/api/articles?limit=1")
+    assert resp.status_code == 200
+    assert len(resp.json["articles"]) == 1
+    if estimate_threshold:
+        # planner estimates are only approximate
+        assert resp.json["articlesCount"] >= 1
+    else:
+        assert resp.json["articlesCount"] == 3
+        assert client.get("/api/articles?tag=mock").json["articlesCount"] == 2
+
+
+def test_get_articles_count_invalidated_on_create(client, add_user):
+    user = add_user()
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    assert client.get("/api/articles").json["articlesCount"] == 0
+
+    payload = {"article": {"title": "T", "description": "D", "body": "B"}}
+    assert (
+        client.post("/api/articles", json=payload, headers=headers).status_code == 200
+    )
+    assert client.get("/api/articles").json["articlesCount"] == 1
+
+
+def test_get_articles_invalid_cursor(client):
+    resp = client.get("/api/articles?cursor=not-a-cursor")
+    assert resp.status_code == 400
+
+
+@mark.parametrize(
+    "url",
+    ["/api/articles", "/api/articles/feed", "/api/articles/search?q=x", "/api/tags"],
+)
+@mark.parametrize("limit", ["0", "-1", "many"])
+def test_get_invalid_limit(url, limit, client, add_user):
+    headers = {"Authorization": f"Token {generate_jwt(add_user()['id'])}"}
+    separator = "&" if "?" in url else "?"
+    resp = client.get(f"{url}{separator}limit={limit}", headers=headers)
+    assert resp.status_code == 400
+    assert resp.json["error"] == "Invalid limit"
+
+
+@mark.parametrize(
+    "url",
+    ["/api/articles", "/api/articles/feed", "/api/articles/search?q=x", "/api/tags"],
+)
+@mark.parametrize("offset", ["-1", "many"])
+def test_get_invalid_offset(url, offset, client, add_user):
+    headers = {"Authorization": f"Token {generate_jwt(add_user()['id'])}"}
+    separator = "&" if "?" in url else "?"
+    resp = client.get(f"{url}{separator}offset={offset}", headers=headers)
+    assert resp.status_code == 400
+    assert resp.json["messages"] == ["Offset must be a non-negative integer."]
+
+
+def test_paginate_rows_empty_page():
+    assert articles_handler._paginate_rows([object()], 0) == ([], None)
+
+
+def test_search_articles_limit_is_clamped(monkeypatch, client, add_article):
+    monkeypatch.setattr(articles_routes, "MAX_PAGE_LIMIT", 2)
+    for _ in range(3):
+        add_article(title="Clamped article")
+
+    resp = client.get("/api/articles/search?q=clamped&limit=50")
+    assert len(resp.json["articles"]) == 2
+    assert resp.json["nextCursor"]
+
+
+def test_get_articles_viewer_flags(
+    client, add_user, add_article, add_user_follow, add_article_favorite
+):
+    viewer, followed_author, other_author = add_user(), add_user(), add_user()
+    add_user_follow(user_id=viewer["id"], following_user_id=followed_author["id"])
+    favorited = add_article(author_user_id=followed_author["id"], tags=["a", "b"])
+    add_article_favorite(user_id=viewer["id"], article_id=favorited["id"])
+    add_article_favorite(user_id=other_author["id"], article_id=favorited["id"])
+    add_article(author_user_id=other_author["id"])
+
+    resp = client.get(
+        "/api/articles",
+        headers={"Authorization": f"Token {generate_jwt(viewer['id'])}"},
+    )
+    assert resp.status_code == 200
+    flags = {
+        article["slug"]: (
+            article["favorited"],
+            article["favoritesCount"],
+            article["author"]["following"],
+            sorted(article["tagList"]),
+        )
+        for article in resp.json["articles"]
+    }
+    assert flags[favorited["slug"]] == (True, 2, True, ["a", "b"])
+    assert [value for key, value in flags.items() if key != favorited["slug"]] == [
+        (False, 0, False, ["mock"])
+    ]
+
+
 def test_get_feed(client, add_user, add_article, add_user_follow):
     # setup
     user = add_user()
@@ -61,12 +211,12 @@ def test_get_feed(client, add_user, add_article, add_user_follow):
             "slug": article["slug"],
             "title": article["title"],
             "description": article["description"],
-            "body": article["body"],
             "tagList": article["tags"],
             "createdAt": article["created_date"],
             "updatedAt": article["updated_date"],
             "favorited": False,
             "favoritesCount": 0,
+            "commentsCount": 0,
             "author": {
                 "username": folliwng_user["username"],
                 "bio": folliwng_user["bio"],
@@ -76,12 +226,521 @@ def test_get_feed(client, add_user, add_article, add_user_follow):
         }
 
 
+def test_feed_follows_and_unfollows(client, add_user, add_article):
+    user, author = add_user(), add_user()
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    existing = add_article(author_user_id=author["id"], ts="2020-01-01T00:00:00+00:00")
+
+    # following backfills the author's existing articles
+    client.post(f"/api/profiles/{author['username']}/follow", headers=headers)
+    resp = client.get("/api/articles/feed", headers=headers)
+    assert [a["slug"] for a in resp.json["articles"]] == [existing["slug"]]
+
+    # new articles are pushed into follower timelines
+    payload = {"article": {"title": "New", "description": "D", "body": "B"}}
+    author_headers = {"Authorization": f"Token {generate_jwt(author['id'])}"}
+    created = client.post("/api/articles", json=payload, headers=author_headers)
+    resp = client.get("/api/articles/feed", headers=headers)
+    assert [a["slug"] for a in resp.json["articles"]] == [
+        created.json["article"]["slug"],
+        existing["slug"],
+    ]
+
+    # unfollowing trims the timeline
+    client.delete(f"/api/profiles/{author['username']}/follow", headers=headers)
+    resp = client.get("/api/articles/feed", headers=headers)
+    assert resp.json["articles"] == []
+    assert resp.json["articlesCount"] == 0
+
+
+def test_feed_merges_pulled_authors(
+    monkeypatch, client, mock_db_session, add_user, add_article, add_user_follow
+):
+    monkeypatch.setattr(feed, "FEED_FANOUT_FOLLOWER_LIMIT", 2)
+    user, other_user = add_user(), add_user()
+    pushed_author, pulled_author = add_user(), add_user()
+    add_user_follow(user_id=user["id"], following_user_id=pushed_author["id"])
+    add_user_follow(user_id=user["id"], following_user_id=pulled_author["id"])
+    add_user_follow(user_id=other_user["id"], following_user_id=pulled_author["id"])
+
+    articles = [
+        add_article(author_user_id=author["id"])
+        for author in (pushed_author, pulled_author, pulled_author, pushed_author)
+    ]
+    expected = [article["slug"] for article in reversed(articles)]
+
+    # only the author below the threshold was fanned out
+    assert (
+        mock_db_session.execute(
+            satext("SELECT COUNT(*) FROM user_feed_items WHERE user_id = :user_id"),
+            {"user_id": user["id"]},
+        ).scalar()
+        == 2
+    )
+
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    slugs, cursor = [], None
+    for _ in range(3):
+        query = "/api/articles/feed?limit=3" + (f"&cursor={cursor}" if cursor else "")
+        resp = client.get(query, headers=headers)
+        assert resp.status_code == 200
+        assert resp.json["articlesCount"] == len(expected)
+        slugs.extend(article["slug"] for article in resp.json["articles"])
+        if not (cursor := resp.json["nextCursor"]):
+            break
+
+    assert slugs == expected
+
+    resp = client.get("/api/articles/feed?limit=2&offset=1", headers=headers)
+    assert [article["slug"] for article in resp.json["articles"]] == expected[1:3]
+
+
+def test_feed_keeps_author_pulled_below_limit(
+    test_app, monkeypatch, client, add_user, add_user_follow
+):
+    monkeypatch.setattr(feed, "FEED_FANOUT_FOLLOWER_LIMIT", 2)
+    user, other_user, author = add_user(), add_user(), add_user()
+    add_user_follow(user_id=user["id"], following_user_id=author["id"])
+    add_user_follow(user_id=other_user["id"], following_user_id=author["id"])
+
+    # posted while pulled, so copied into no timeline
+    article = client.post(
+        "/api/articles",
+        json={"article": {"title": "Pulled", "description": "D", "body": "B"}},
+        headers={"Authorization": f"Token {generate_jwt(author['id'])}"},
+    ).json["article"]
+
+    client.delete(
+        f"/api/profiles/{author['username']}/follow",
+        headers={"Authorization": f"Token {generate_jwt(other_user['id'])}"},
+    )
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    resp = client.get("/api/articles/feed", headers=headers)
+    assert [a["slug"] for a in resp.json["articles"]] == [article["slug"]]
+    assert resp.json["articlesCount"] == 1
+
+    # rebuilding copies the article back and fans the author out again
+    assert test_app.test_cli_runner().invoke(args=["rebuild-feeds"]).exit_code == 0
+    resp = client.get("/api/articles/feed", headers=headers)
+    assert [a["slug"] for a in resp.json["articles"]] == [article["slug"]]
+
+
+def test_push_article_invalidates_follower_counts(
+    monkeypatch, client, add_user, add_article, add_user_follow
+):
+    follower, bystander, author = add_user(), add_user(), add_user()
+    add_user_follow(user_id=follower["id"], following_user_id=author["id"])
+    for user in (follower, bystander):
+        client.get(
+            "/api/articles/feed",
+            headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+        )
+
+    add_article(author_user_id=author["id"])
+    assert feed._FEED_COUNT_CACHE.get(follower["id"]) is None
+    assert feed._FEED_COUNT_CACHE.get(bystander["id"]) == 0
+
+    # a pulled author's followers are not listed, every count is dropped
+    monkeypatch.setattr(feed, "FEED_FANOUT_FOLLOWER_LIMIT", 1)
+    pulled_author = add_user()
+    add_user_follow(user_id=follower["id"], following_user_id=pulled_author["id"])
+    add_article(author_user_id=pulled_author["id"])
+    assert feed._FEED_COUNT_CACHE.get(bystander["id"]) is None
+
+
+def test_rebuild_feeds(
+    test_app, client, mock_db_session, add_user, add_article, add_user_follow
+):
+    user, author = add_user(), add_user()
+    add_user_follow(user_id=user["id"], following_user_id=author["id"])
+    article = add_article(author_user_id=author["id"])
+    mock_db_session.execute(satext("DELETE FROM user_feed_items"))
+
+    result = test_app.test_cli_runner().invoke(args=["rebuild-feeds"])
+    assert result.exit_code == 0
+
+    resp = client.get(
+        "/api/articles/feed",
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    assert [a["slug"] for a in resp.json["articles"]] == [article["slug"]]
+
+
+def test_search_articles(client, add_article):
+    in_body = add_article(body="All about the flask framework")
+    in_title = add_article(title="Flask tips")
+    add_article(title="Unrelated", body="Nothing to see here")
+
+    resp = client.get("/api/articles/search?q=flask")
+    assert resp.status_code == 200
+    assert resp.json["articlesCount"] == 2
+    assert [article["slug"] for article in resp.json["articles"]] == [
+        in_title["slug"],
+        in_body["slug"],
+    ]
+
+    resp = client.get("/api/articles/search?q=flask&limit=1")
+    assert [article["slug"] for article in resp.json["articles"]] == [in_title["slug"]]
+    resp = client.get(
+        f"/api/articles/search?q=flask&limit=1&cursor={resp.json['nextCursor']}"
+    )
+    assert [article["slug"] for article in resp.json["articles"]] == [in_body["slug"]]
+    assert resp.json["nextCursor"] is None
+
+
+def test_search_articles_requires_query(client):
+    resp = client.get("/api/articles/search")
+    assert resp.status_code == 400
+
+
 def test_get_article(client, add_article):
     article = add_article()
     resp = client.get(f"/api/articles/{article['slug']}")
     assert resp.status_code == 200
     assert resp.json["article"]["slug"] == article["slug"]
 
+    # cache hits are rebuilt without validation into the same body
+    assert client.get(f"/api/articles/{article['slug']}").data == resp.data
+
+
+def test_get_article_cache_overlays_viewer(
+    monkeypatch,
+    client,
+    add_user,
+    add_article,
+    add_user_follow,
+    add_article_favorite,
+    fail_if_called,
+):
+    viewer, author = add_user(), add_user()
+    article = add_article(author_user_id=author["id"])
+    add_user_follow(user_id=viewer["id"], following_user_id=author["id"])
+    add_article_favorite(user_id=viewer["id"], article_id=article["id"])
+    assert client.get(f"/api/articles/{article['slug']}").status_code == 200
+
+    fail = fail_if_called("article should be served from cache")
+
+    with monkeypatch.context() as m:
+        m.setattr(articles_handler, "_hydrate_articles", fail)
+        resp = client.get(
+            f"/api/articles/{article['slug']}",
+            headers={"Authorization": f"Token {generate_jwt(viewer['id'])}"},
+        )
+        assert resp.json["article"]["favorited"] is True
+        assert resp.json["article"]["author"]["following"] is True
+
+        resp = client.get(f"/api/articles/{article['slug']}")
+        assert resp.json["article"]["favorited"] is False
+        assert resp.json["article"]["author"]["following"] is False
+
+
+class RedisStandIn:
+    """Just enough of the Redis client API for `RedisCache`."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def set(self, name, value, ex=None):
+        self.data[name] = value.encode("utf-8")
+
+    def delete(self, name):
+        self.data.pop(name, None)
+
+    def scan_iter(self, match):
+        return [name for name in list(self.data) if name.startswith(match[:-1])]
+
+
+def test_get_article_redis_cache(monkeypatch, client, add_user, add_article):
+    redis = RedisStandIn()
+    monkeypatch.setattr(
+        articles_handler, "_ARTICLE_CACHE", RedisCache(redis, prefix="test:article:")
+    )
+    user = add_user()
+    article = add_article()
+    cache_key = f"test:article:{article['id']}"
+
+    resp = client.get(f"/api/articles/{article['slug']}")
+    assert resp.json["article"]["favoritesCount"] == 0
+    assert cache_key in redis.data
+
+    # favoriting invalidates the shared entry so every worker sees the new count
+    client.post(
+        f"/api/articles/{article['slug']}/favorite",
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    assert cache_key not in redis.data
+    resp = client.get(f"/api/articles/{article['slug']}")
+    assert resp.json["article"]["favoritesCount"] == 1
+
+
+class RedisDown:
+    def __getattr__(self, name):
+        def refuse(*args, **kwargs):
+            raise ConnectionError("Connection refused")
+
+        return refuse
+
+
+def test_get_article_redis_unavailable(monkeypatch, client, add_user, add_article):
+    cache = RedisCache(RedisDown(), prefix="test:article:", errors=(ConnectionError,))
+    monkeypatch.setattr(articles_handler, "_ARTICLE_CACHE", cache)
+    article = add_article()
+
+    # served from the database, and writes still go through
+    resp = client.get(f"/api/articles/{article['slug']}")
+    assert resp.status_code == 200
+    resp = client.post(
+        f"/api/articles/{article['slug']}/favorite",
+        headers={"Authorization": f"Token {generate_jwt(add_user()['id'])}"},
+    )
+    assert resp.json["article"]["favoritesCount"] == 1
+    cache.clear()
+
+
+def test_row_mappers_match_model_fields():
+    now = datetime.now(timezone.utc)
+    row = SimpleNamespace(
+        id=uuid4(),
+        slug="mapped",
+        title="Mapped",
+        description="D",
+        body="B",
+        created_date=now,
+        updated_date=now,
+        favorites_count=1,
+        comments_count=2,
+        author_username="author",
+        author_bio=None,
+        author_image=None,
+    )
+    article_fields = {"tag_list": ["mock"], "favorited": False, "following": True}
+    mapped = [
+        (Profile, articles_handler._profile_from_row(row, following=True)),
+        (Article, articles_handler._article_from_row(row, **article_fields)),
+        (
+            ArticlePreview,
+            articles_handler._article_from_row(
+                row, **article_fields, include_body=False
+            ),
+        ),
+        (Comment, articles_handler._comment_from_row(row, following=True)),
+    ]
+
+    # unvalidated models must hold every field, in order, with valid values
+    for model_cls, model in mapped:
+        assert type(model) is model_cls
+        assert list(model.__dict__) == list(model_cls.model_fields)
+        assert model_cls.model_validate(model.model_dump()) == model
+
+
+def test_get_article_cache_checks_version(
+    client, mock_db_session, add_user, add_article
+):
+    author = add_user()
+    article = add_article(author_user_id=author["id"])
+    url = f"/api/articles/{article['slug']}"
+    etag = client.get(url).headers["ETag"]
+
+    # writes that bypass this worker's invalidation, e.g. through another worker
+    mock_db_session.execute(
+        satext(
+            """
+            UPDATE users
+            SET bio = 'Edited elsewhere.', updated_date = updated_date + interval '1s'
+            WHERE id = :id
+            """
+        ).bindparams(id=author["id"])
+    )
+    mock_db_session.execute(
+        satext(
+            "UPDATE articles SET favorites_count = favorites_count + 1 WHERE id = :id"
+        ).bindparams(id=article["id"])
+    )
+
+    resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json["article"]["author"]["bio"] == "Edited elsewhere."
+    assert resp.json["article"]["favoritesCount"] == 1
+
+
+def test_get_article_conditional(
+    monkeypatch, client, add_user, add_article, fail_if_called
+):
+    user = add_user()
+    article = add_article()
+    resp = client.get(f"/api/articles/{article['slug']}")
+    etag = resp.headers["ETag"]
+    # counters and viewer flags carry no timestamp to validate against
+    assert "Last-Modified" not in resp.headers
+
+    fail = fail_if_called("unchanged article should not be hydrated")
+
+    with monkeypatch.context() as m:
+        m.setattr(articles_handler, "get_article_by_slug", fail)
+        resp = client.get(
+            f"/api/articles/{article['slug']}", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 304
+        assert resp.headers["ETag"] == etag
+
+    # a favorite leaves every timestamp alone, so If-Modified-Since is ignored
+    client.post(
+        f"/api/articles/{article['slug']}/favorite",
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    resp = client.get(
+        f"/api/articles/{article['slug']}",
+        headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"},
+    )
+    assert resp.status_code == 200
+    assert resp.json["article"]["favoritesCount"] == 1
+
+    # the favorites count and the viewer's flags are part of the validator
+    resp = client.get(
+        f"/api/articles/{article['slug']}", headers={"If-None-Match": etag}
+    )
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+def test_get_articles_conditional(monkeypatch, client, add_user, add_article):
+    user = add_user()
+    article = add_article()
+    etag = client.get("/api/articles").headers["ETag"]
+    assert (
+        client.get("/api/articles", headers={"If-None-Match": etag}).status_code == 304
+    )
+
+    client.post(
+        f"/api/articles/{article['slug']}/favorite",
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    # the cached page outlives a favorite for ARTICLES_PAGE_FAVORITES_TTL only
+    assert (
+        client.get("/api/articles", headers={"If-None-Match": etag}).status_code == 304
+    )
+    monkeypatch.setattr(articles_routes, "ARTICLES_PAGE_FAVORITES_TTL", 0)
+    assert (
+        client.get("/api/articles", headers={"If-None-Match": etag}).status_code == 200
+    )
+
+    # favorited filters list other articles after a favorite, so move on at once
+    url = f"/api/articles?favorited={user['username']}"
+    assert client.get(url).json["articlesCount"] == 1
+    client.delete(
+        f"/api/articles/{article['slug']}/favorite",
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    monkeypatch.setattr(articles_routes, "ARTICLES_PAGE_FAVORITES_TTL", 60)
+    assert client.get(url).json["articlesCount"] == 0
+
+
+def test_get_articles_compressed(client, add_article):
+    add_article(body="compressible " * 200)
+
+    resp = client.get(
+        "/api/articles?includeBody=true", headers={"Accept-Encoding": "gzip"}
+    )
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    page = json.loads(gzip.decompress(resp.data))
+    assert page["articles"][0]["body"] == "compressible " * 200
+
+    resp = client.get("/api/articles?includeBody=true")
+    assert "Content-Encoding" not in resp.headers
+    assert resp.json == page
+
+
+def test_get_articles_small_response_not_compressed(client):
+    resp = client.get("/api/articles", headers={"Accept-Encoding": "gzip"})
+    assert len(resp.data) < compression.COMPRESSION_MIN_SIZE
+    assert "Content-Encoding" not in resp.headers
+
+
+def test_get_articles_anonymous_page_cache(
+    monkeypatch, client, add_user, add_article, fail_if_called
+):
+    add_article(body="compressible " * 200)
+    headers = {"Accept-Encoding": "gzip"}
+    first = client.get("/api/articles?includeBody=true", headers=headers)
+
+    fail = fail_if_called("anonymous page should be served precompressed")
+
+    with monkeypatch.context() as m:
+        m.setattr(articles_handler, "get_articles", fail)
+        m.setitem(compression._CODECS, "gzip", fail)
+        resp = client.get("/api/articles?includeBody=true", headers=headers)
+        assert resp.data == first.data
+        assert resp.headers["Content-Encoding"] == "gzip"
+
+    # any article write moves the cache key on
+    user = add_user()
+    client.post(
+        "/api/articles",
+        json={"article": {"title": "T", "description": "D", "body": "B"}},
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    assert client.get("/api/articles").json["articlesCount"] == 2
+
+
+def test_get_articles_streamed(monkeypatch, client, add_user, add_article):
+    user = add_user()
+    for _ in range(5):
+        add_article(author_user_id=user["id"], tags=["streamed"])
+    token = generate_jwt(user["id"])
+    pages = ["/api/articles?limit=3", "/api/articles?limit=3&includeBody=true"]
+    buffered = [
+        client.get(url, headers={"Authorization": f"Token {token}"}) for url in pages
+    ]
+
+    monkeypatch.setattr(articles_routes, "STREAM_MIN_LIMIT", 2)
+    monkeypatch.setattr(articles_handler, "STREAM_BATCH_SIZE", 2)
+    for url, expected in zip(pages, buffered):
+        resp = client.get(url, headers={"Authorization": f"Token {token}"})
+        assert resp.is_streamed
+        assert resp.data == expected.data
+
+    # the last page ends without a cursor
+    cursor = buffered[0].json["nextCursor"]
+    resp = client.get(f"/api/articles?limit=3&cursor={cursor}")
+    assert [a["slug"] for a in resp.json["articles"]] == [
+        a["slug"] for a in client.get("/api/articles").json["articles"][3:]
+    ]
+    assert resp.json["nextCursor"] is None
+
+    resp = client.get("/api/articles?limit=3", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(resp.data))["articlesCount"] == 5
+
+    assert client.get("/api/articles?limit=3&cursor=bogus").status_code == 400
+
+
+def test_get_articles_by_slugs(
+    monkeypatch, client, add_user, add_article, add_article_favorite
+):
+    user = add_user()
+    first, second, third = [add_article() for _ in range(3)]
+    add_article_favorite(user_id=user["id"], article_id=first["id"])
+
+    resp = client.get(
+        f"/api/articles?slugs={third['slug']},missing,{first['slug']},{third['slug']}",
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    assert resp.status_code == 200
+    assert [a["slug"] for a in resp.json["articles"]] == [third["slug"], first["slug"]]
+    assert [a["favorited"] for a in resp.json["articles"]] == [False, True]
+    assert resp.json["articlesCount"] == 2
+    assert resp.json["nextCursor"] is None
+
+    assert client.get("/api/articles?slugs=").json["articles"] == []
+
+    monkeypatch.setattr(articles_routes, "MAX_BATCH_SIZE", 2)
+    resp = client.get(f"/api/articles?slugs=a,b,{second['slug']}")
+    assert resp.status_code == 400
+
 
 def test_create_article_unauthenticated(client):
     payload = {
@@ -133,6 +792,78 @@ def test_update_article(client, add_user, add_article):
     )
     assert resp.status_code == 200
     assert resp.json["article"]["title"] == payload["article"]["title"]
+    assert resp.json["article"]["tagList"] == article["tags"]
+    assert resp.json["article"]["author"]["username"] == user["username"]
+
+
+def test_update_article_title_moves_slug(client, add_user, add_article):
+    user = add_user()
+    article = add_article(author_user_id=user["id"])
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+
+    # resolve the slug once so the update has to invalidate it
+    assert client.get(f"/api/articles/{article['slug']}").status_code == 200
+    resp = client.put(
+        f"/api/articles/{article['slug']}",
+        json={"article": {"title": "Renamed"}},
+        headers=headers,
+    )
+    new_slug = resp.json["article"]["slug"]
+
+    assert new_slug != article["slug"]
+    assert client.get(f"/api/articles/{article['slug']}").status_code == 404
+    assert client.get(f"/api/articles/{new_slug}").status_code == 200
+
+    client.delete(f"/api/articles/{new_slug}", headers=headers)
+    assert client.get(f"/api/articles/{new_slug}").status_code == 404
+
+
+def test_stale_slug_cache_is_not_followed(
+    client, mock_db_session, add_user, add_article
+):
+    user = add_user()
+    article = add_article(author_user_id=user["id"])
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    url = f"/api/articles/{article['slug']}"
+
+    def rename_elsewhere(slug):
+        # as another worker would, leaving this worker's slug cache behind
+        mock_db_session.execute(
+            satext("UPDATE articles SET slug = :slug WHERE id = :id").bindparams(
+                slug=slug, id=article["id"]
+            )
+        )
+
+    assert client.get(url).status_code == 200
+    rename_elsewhere("renamed")
+    assert client.post(f"{url}/favorite", headers=headers).status_code == 404
+    assert articles_handler._SLUG_CACHE.get(article["slug"]) is None
+
+    rename_elsewhere(article["slug"])
+    assert client.get(url).status_code == 200
+    rename_elsewhere("renamed")
+    assert client.get(f"{url}/comments").json["comments"] == []
+    resp = client.post(
+        f"{url}/comments", json={"comment": {"body": "Hi"}}, headers=headers
+    )
+    assert resp.status_code == 404
+
+    rename_elsewhere(article["slug"])
+    assert client.get(url).status_code == 200
+    rename_elsewhere("renamed")
+    assert client.delete(url, headers=headers).status_code == 404
+    assert client.get(url).status_code == 404
+    assert client.get("/api/articles/renamed").status_code == 200
+
+
+def test_update_article_not_author(client, add_user, add_article):
+    article = add_article()
+    resp = client.put(
+        f"/api/articles/{article['slug']}",
+        json={"article": {"title": "Hijacked"}},
+        headers={"Authorization": f"Token {generate_jwt(add_user()['id'])}"},
+    )
+    assert resp.status_code == 404
 
 
 def test_delete_article_unauthenticated(client, add_article):
@@ -166,6 +897,78 @@ def test_favorite_article(client, add_user, add_article):
     assert resp.json["article"]["favorited"] is True
 
 
+def test_favorite_article_returns_article(
+    client, add_user, add_article, add_user_follow
+):
+    user, author = add_user(), add_user()
+    add_user_follow(user_id=user["id"], following_user_id=author["id"])
+    article = add_article(author_user_id=author["id"], tags=["fav"])
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+
+    resp = client.post(f"/api/articles/{article['slug']}/favorite", headers=headers)
+    assert resp.json["article"]["tagList"] == ["fav"]
+    assert resp.json["article"]["body"] == article["body"]
+    assert resp.json["article"]["author"]["following"] is True
+
+    resp = client.post("/api/articles/missing/favorite", headers=headers)
+    assert resp.status_code == 404
+
+
+def test_favorite_article_counts_once(client, add_user, add_article):
+    user = add_user()
+    article = add_article()
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    for _ in range(2):
+        resp = client.post(f"/api/articles/{article['slug']}/favorite", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json["article"]["favoritesCount"] == 1
+
+    for _ in range(2):
+        resp = client.delete(
+            f"/api/articles/{article['slug']}/favorite", headers=headers
+        )
+        assert resp.status_code == 200
+        assert resp.json["article"]["favoritesCount"] == 0
+
+
+def test_favorite_article_updates_favorited_count(client, add_user, add_article):
+    user = add_user()
+    article = add_article()
+    url = f"/api/articles?favorited={user['username']}"
+    assert client.get(url).json["articlesCount"] == 0
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+
+    client.post(f"/api/articles/{article['slug']}/favorite", headers=headers)
+    resp = client.get(url)
+    assert len(resp.json["articles"]) == resp.json["articlesCount"] == 1
+
+    client.delete(f"/api/articles/{article['slug']}/favorite", headers=headers)
+    assert client.get(url).json["articlesCount"] == 0
+
+
+def test_reconcile_favorites_count(
+    test_app, client, mock_db_session, add_user, add_article
+):
+    article = add_article()
+    mock_db_session.execute(
+        satext(
+            """
+            INSERT INTO article_favorites (user_id, article_id)
+            VALUES (:user_id, :article_id)
+            """
+        ).bindparams(user_id=add_user()["id"], article_id=article["id"])
+    )
+    resp = client.get(f"/api/articles/{article['slug']}")
+    assert resp.json["article"]["favoritesCount"] == 0
+
+    result = test_app.test_cli_runner().invoke(args=["reconcile-counters"])
+    assert result.exit_code == 0
+    assert "reconciled 1 articles" in result.output
+
+    resp = client.get(f"/api/articles/{article['slug']}")
+    assert resp.json["article"]["favoritesCount"] == 1
+
+
 def test_unfavorite_article(client, add_user, add_article, add_article_favorite):
     user = add_user()
     article = add_article()
@@ -208,6 +1011,53 @@ def test_get_comments(client, add_user, add_article, add_article_comment):
     ]
 
 
+def test_get_comments_cursor_pagination(client, add_article, add_article_comment):
+    article = add_article()
+    # two comments share a timestamp, the id breaks the tie
+    timestamps = [f"2020-01-0{day}T00:00:00+00:00" for day in (1, 2, 2, 3, 4)]
+    comments = [
+        add_article_comment(article_id=article["id"], ts=ts) for ts in timestamps
+    ]
+    expected = [
+        comment["id"]
+        for comment in sorted(comments, key=lambda c: (c["created_date"], c["id"]))
+    ]
+
+    url = f"/api/articles/{article['slug']}/comments?limit=2"
+    seen, cursor = [], None
+    while True:
+        resp = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert resp.status_code == 200
+        seen.extend(comment["id"] for comment in resp.json["comments"])
+        if not (cursor := resp.json["nextCursor"]):
+            break
+
+    assert seen == expected
+
+    resp = client.get(f"/api/articles/{article['slug']}/comments?cursor=bogus")
+    assert resp.status_code == 400
+
+    resp = client.get(f"/api/articles/{article['slug']}/comments?limit=0")
+    assert resp.status_code == 400
+
+
+def test_get_comments_streamed(monkeypatch, client, add_article, add_article_comment):
+    article = add_article()
+    for _ in range(5):
+        add_article_comment(article_id=article["id"])
+    url = f"/api/articles/{article['slug']}/comments?limit=4"
+    expected = client.get(url)
+
+    monkeypatch.setattr(articles_routes, "STREAM_MIN_LIMIT", 2)
+    monkeypatch.setattr(articles_handler, "STREAM_BATCH_SIZE", 3)
+    resp = client.get(url)
+    assert resp.is_streamed
+    assert resp.data == expected.data
+
+    resp = client.get("/api/articles/missing/comments?limit=4")
+    assert resp.json == {"comments": [], "nextCursor": None}
+
+
 def test_create_comment(client, add_user, add_article):
     user = add_user()
     article = add_article()
@@ -219,6 +1069,43 @@ def test_create_comment(client, add_user, add_article):
     )
     assert resp.status_code == 200
     assert resp.json["comment"]["body"] == payload["comment"]["body"]
+    assert resp.json["comment"]["author"]["username"] == user["username"]
+
+
+def test_create_comment_article_not_found(client, add_user):
+    user = add_user()
+    resp = client.post(
+        "/api/articles/missing/comments",
+        json={"comment": {"body": "A test comment."}},
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    assert resp.status_code == 404
+
+
+def test_get_comments_conditional(client, add_user, add_article):
+    user = add_user()
+    article = add_article()
+    url = f"/api/articles/{article['slug']}/comments"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(
+        url,
+        json={"comment": {"body": "A test comment."}},
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert len(resp.json["comments"]) == 1
+
+    # the viewer's follow state of the page's commenters is part of the validator
+    viewer = add_user()
+    headers = {"Authorization": f"Token {generate_jwt(viewer['id'])}"}
+    etag = client.get(url, headers=headers).headers["ETag"]
+    client.post(f"/api/profiles/{user['username']}/follow", headers=headers)
+    resp = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json["comments"][0]["author"]["following"] is True
 
 
 def test_delete_comment(client, add_user, add_article, add_article_comment):
@@ -235,17 +1122,164 @@ def test_delete_comment(client, add_user, add_article, add_article_comment):
     assert resp.json["message"] == "Comment deleted"
 
 
+def test_comments_count(client, add_user, add_article):
+    user = add_user()
+    article = add_article()
+    url = f"/api/articles/{article['slug']}"
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    assert client.get(url).json["article"]["commentsCount"] == 0
+
+    comment = client.post(
+        f"{url}/comments",
+        json={"comment": {"body": "A test comment."}},
+        headers=headers,
+    ).json["comment"]
+    assert client.get(url).json["article"]["commentsCount"] == 1
+    assert client.get("/api/articles").json["articles"][0]["commentsCount"] == 1
+
+    client.delete(f"{url}/comments/{comment['id']}", headers=headers)
+    # deleting a comment that is already gone leaves the counter alone
+    client.delete(f"{url}/comments/{comment['id']}", headers=headers)
+    assert client.get(url).json["article"]["commentsCount"] == 0
+
+
+def test_reconcile_comments_count(
+    test_app, client, mock_db_session, add_user, add_article
+):
+    article = add_article()
+    mock_db_session.execute(
+        satext(
+            """
+            INSERT INTO article_comments (article_id, commenter_user_id, body)
+            VALUES (:article_id, :user_id, 'Not counted.')
+            """
+        ).bindparams(user_id=add_user()["id"], article_id=article["id"])
+    )
+    resp = client.get(f"/api/articles/{article['slug']}")
+    assert resp.json["article"]["commentsCount"] == 0
+
+    result = test_app.test_cli_runner().invoke(args=["reconcile-counters"])
+    assert result.exit_code == 0
+    assert "comments_count: reconciled 1 articles" in result.output
+
+    resp = client.get(f"/api/articles/{article['slug']}")
+    assert resp.json["article"]["commentsCount"] == 1
+
+
 #
 # Article Comments Tests
 #
 def test_get_tags(client, add_article):
     add_article(tags=["mock"])
     add_article(tags=["test", "article"])
+    add_article(tags=["test"])
 
     resp = client.get("/api/tags")
     assert resp.status_code == 200
     assert resp.json["tags"] == [
-        "mock",
         "test",
         "article",
+        "mock",
     ]
+    assert resp.json["tagCounts"] == {"test": 2, "article": 1, "mock": 1}
+
+    resp = client.get("/api/tags?limit=1&offset=1")
+    assert resp.json["tags"] == ["article"]
+
+
+def test_get_tags_is_cached(monkeypatch, client, add_user, add_article, fail_if_called):
+    add_article(tags=["cached"])
+    assert client.get("/api/tags").json["tags"] == ["cached"]
+
+    fail = fail_if_called("tags should be served from cache")
+
+    with monkeypatch.context() as m:
+        m.setattr(articles_handler, "get_popular_tags", fail)
+        assert client.get("/api/tags").json["tags"] == ["cached"]
+
+    # creating a brand new tag invalidates the cached responses
+    user = add_user()
+    payload = {
+        "article": {"title": "T", "description": "D", "body": "B", "tagList": ["new"]}
+    }
+    client.post(
+        "/api/articles",
+        json=payload,
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    assert client.get("/api/tags").json["tags"] == ["cached", "new"]
+
+
+def test_create_article_duplicate_tags(client, add_user):
+    user = add_user()
+    resp = client.post(
+        "/api/articles",
+        json={
+            "article": {
+                "title": "T",
+                "description": "D",
+                "body": "B",
+                "tagList": ["dup", "other", "dup"],
+            }
+        },
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    assert resp.status_code == 200
+    assert sorted(resp.json["article"]["tagList"]) == ["dup", "other"]
+    assert client.get("/api/tags").json["tagCounts"] == {"dup": 1, "other": 1}
+
+
+def test_get_tags_conditional(client, add_article):
+    add_article(tags=["mock"])
+    etag = client.get("/api/tags").headers["ETag"]
+    resp = client.get("/api/tags", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+
+
+def test_get_tags_precompressed(monkeypatch, client, add_article, fail_if_called):
+    monkeypatch.setattr(compression, "COMPRESSION_MIN_SIZE", 0)
+    add_article(tags=["mock"])
+    headers = {"Accept-Encoding": "gzip"}
+    first = client.get("/api/tags", headers=headers)
+    assert json.loads(gzip.decompress(first.data))["tags"] == ["mock"]
+
+    fail = fail_if_called("cached tags should not be compressed again")
+
+    monkeypatch.setitem(compression._CODECS, "gzip", fail)
+    assert client.get("/api/tags", headers=headers).data == first.data
+
+
+def test_delete_article_updates_tag_counts(client, add_user, add_article):
+    user = add_user()
+    article = add_article(author_user_id=user["id"], tags=["gone"])
+    assert client.get("/api/tags").json["tagCounts"] == {"gone": 1}
+
+    client.delete(
+        f"/api/articles/{article['slug']}",
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    assert client.get("/api/tags").json["tags"] == []
+
+
+def test_create_article_revives_unused_tag(client, add_user, add_article):
+    user = add_user()
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    article = add_article(author_user_id=user["id"], tags=["revived"])
+    client.delete(f"/api/articles/{article['slug']}", headers=headers)
+    assert client.get("/api/tags").json["tags"] == []
+
+    # the tag row is reused with a count of 0, the cached response must move on
+    client.post(
+        "/api/articles",
+        json={
+            "article": {
+                "title": "T",
+                "description": "D",
+                "body": "B",
+                "tagList": ["revived"],
+            }
+        },
+        headers=headers,
+    )
+    assert client.get("/api/tags").json["tagCounts"] == {"revived": 1}
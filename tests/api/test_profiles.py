@@ -1,5 +1,8 @@
 from pytest import mark
+from sqlalchemy import text as satext
+from realworld.api.core import feed
 from realworld.api.core.auth import generate_jwt
+import realworld.api.routes.v1.profiles.routes as profiles_routes
 
 
 #
@@ -35,6 +38,53 @@ def test_get_profile(is_following, is_authenticated, client, add_user, add_user_
     }
 
 
+def test_get_profile_conditional(client, add_user, add_user_follow):
+    user1 = add_user(username="mock-user")
+    user2 = add_user(username="mock-profile-user")
+    url = f"/api/profiles/{user2['username']}"
+    headers = {"Authorization": f"Token {generate_jwt(user1['id'])}"}
+
+    etag = client.get(url, headers=headers).headers["ETag"]
+    resp = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+
+    add_user_follow(user_id=user1["id"], following_user_id=user2["id"])
+    resp = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json["profile"]["following"] is True
+
+
+def test_get_profiles(monkeypatch, client, add_user, add_user_follow):
+    user = add_user(username="mock-user")
+    first = add_user(username="mock-profile-a")
+    second = add_user(username="mock-profile-b")
+    add_user_follow(user_id=user["id"], following_user_id=second["id"])
+
+    resp = client.get(
+        "/api/profiles?usernames=mock-profile-b,missing,mock-profile-a",
+        headers={"Authorization": f"Token {generate_jwt(user['id'])}"},
+    )
+    assert resp.status_code == 200
+    assert resp.json["profiles"] == [
+        {
+            "username": second["username"],
+            "bio": second["bio"],
+            "image": second["image"],
+            "following": True,
+        },
+        {
+            "username": first["username"],
+            "bio": first["bio"],
+            "image": first["image"],
+            "following": False,
+        },
+    ]
+
+    assert client.get("/api/profiles").status_code == 400
+    monkeypatch.setattr(profiles_routes, "MAX_BATCH_SIZE", 1)
+    assert client.get("/api/profiles?usernames=a,b").status_code == 400
+
+
 def test_follow_profile(client, add_user):
     user1 = add_user(username="mock-user")
     user2 = add_user(username="mock-profile-user")
@@ -70,3 +120,59 @@ def test_unfollow_profile(client, add_user, add_user_follow):
         "image": user2["image"],
         "following": False,
     }
+
+
+def test_bulk_follow_profiles(
+    monkeypatch, client, mock_db_session, add_user, add_article
+):
+    user = add_user(username="mock-user")
+    authors = [add_user(username=f"mock-author-{i}") for i in range(3)]
+    for author in authors:
+        add_article(author_user_id=author["id"])
+    headers = {"Authorization": f"Token {generate_jwt(user['id'])}"}
+    # suggestion lists may include the caller, who is skipped rather than followed
+    usernames = [
+        "mock-author-2",
+        "missing",
+        "mock-author-0",
+        "mock-user",
+        "mock-author-1",
+    ]
+
+    backfills = []
+    backfill_feed = feed.backfill_feed
+    monkeypatch.setattr(
+        feed,
+        "backfill_feed",
+        lambda *args: backfills.append(args) or backfill_feed(*args),
+    )
+    resp = client.post(
+        "/api/profiles/follow", json={"usernames": usernames}, headers=headers
+    )
+    assert resp.status_code == 200
+    assert [(p["username"], p["following"]) for p in resp.json["profiles"]] == [
+        ("mock-author-2", True),
+        ("mock-author-0", True),
+        ("mock-user", False),
+        ("mock-author-1", True),
+    ]
+    assert len(backfills) == 1
+    assert client.get("/api/articles/feed", headers=headers).json["articlesCount"] == 3
+
+    # already followed profiles are not counted twice
+    client.post("/api/profiles/follow", json={"usernames": usernames}, headers=headers)
+    followers_counts = mock_db_session.execute(
+        satext("SELECT followers_count FROM users WHERE username LIKE 'mock-author-%'")
+    ).scalars()
+    assert list(followers_counts) == [1, 1, 1]
+
+    resp = client.delete(
+        "/api/profiles/follow",
+        json={"usernames": ["mock-author-0", "mock-author-1"]},
+        headers=headers,
+    )
+    assert [p["following"] for p in resp.json["profiles"]] == [False, False]
+    assert client.get("/api/articles/feed", headers=headers).json["articlesCount"] == 1
+
+    resp = client.post("/api/profiles/follow", json={"usernames": ["mock-author-0"]})
+    assert resp.status_code == 401
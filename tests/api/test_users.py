@@ -13,6 +13,27 @@ def test_create_user(client):
     assert resp.status_code == 200
 
 
+def test_create_user_invalid_json_returns_422(client):
+    resp = client.post(
+        "/api/users", data=b'{"user": {', headers={"Content-Type": "application/json"}
+    )
+    assert resp.status_code == 422
+    assert resp.json["messages"][0]["type"] == "json_invalid"
+
+
+def test_create_user_body_too_large_returns_413(monkeypatch, test_app, client):
+    monkeypatch.setitem(test_app.config, "MAX_CONTENT_LENGTH", 64)
+    payload = {
+        "user": {
+            "username": "mock-user",
+            "email": "mock-user@realworld.io",
+            "password": "x" * 64,
+        }
+    }
+    resp = client.post("/api/users", json=payload)
+    assert resp.status_code == 413
+
+
 def test_create_duplicate_user_returns_400(client, add_user):
     payload = {
         "user": {
@@ -44,6 +65,17 @@ def test_authenticate_user(client, add_user):
     assert resp.json["user"]["token"] is not None
 
 
+def test_authenticate_user_email_is_case_insensitive(client, add_user):
+    user = add_user()
+    resp = client.post(
+        "/api/users/login",
+        json={"user": {"email": user["email"].upper(), "password": user["password"]}},
+    )
+
+    assert resp.status_code == 200
+    assert resp.json["user"]["email"] == user["email"]
+
+
 def test_get_current_user(client, add_user):
     user = add_user()
     resp = client.post(
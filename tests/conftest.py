@@ -2,6 +2,8 @@ from uuid import uuid4
 from pytest import fixture
 from unittest.mock import patch
 from realworld.app import create_app
+from realworld.api.core import feed
+from realworld.api.core.cache import clear_caches
 from sqlalchemy import text as satext
 from datetime import datetime, timezone as tz
 from realworld.api.core.db import _ENGINE, _Session
@@ -56,6 +58,26 @@ def mock_get_db_connection(mock_db_session):
         yield mock_db_conn
 
 
+@fixture(autouse=True)
+def reset_caches():
+    # in-process caches would otherwise leak rows rolled back by other tests
+    clear_caches()
+    yield
+    clear_caches()
+
+
+@fixture(scope="function")
+def fail_if_called():
+    # stands in for a function a cached path must not reach
+    def _fail_if_called(reason):
+        def fail(*args, **kwargs):
+            raise AssertionError(reason)
+
+        return fail
+
+    return _fail_if_called
+
+
 ####################
 # Data Fixtures
 ####################
@@ -117,11 +139,24 @@ def add_user_follow(mock_db_session):
     def _add_user_follow(user_id, following_user_id):
         stmt = satext(
             """
-            INSERT INTO user_follows (user_id, following_user_id)
-            VALUES (:user_id, :following_user_id)
+            WITH followed AS (
+                INSERT INTO user_follows (user_id, following_user_id)
+                VALUES (:user_id, :following_user_id)
+                RETURNING following_user_id
+            )
+            UPDATE users
+            SET
+                followers_count = followers_count + 1,
+                feed_pulled = feed_pulled OR followers_count + 1 >= :fanout_limit
+            WHERE id IN (SELECT following_user_id FROM followed)
             """
-        ).bindparams(user_id=user_id, following_user_id=following_user_id)
+        ).bindparams(
+            user_id=user_id,
+            following_user_id=following_user_id,
+            fanout_limit=feed.FEED_FANOUT_FOLLOWER_LIMIT,
+        )
         mock_db_session.execute(stmt)
+        feed.backfill_feed(mock_db_session.connection(), user_id, [following_user_id])
         return True
 
     return _add_user_follow
@@ -168,9 +203,10 @@ def add_article(mock_db_session, add_user):
                 satext(
                     """
                     WITH upserted_tags AS (
-                        INSERT INTO tags (name)
-                        VALUES (:name)
-                        ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                        INSERT INTO tags (name, articles_count)
+                        VALUES (:name, 1)
+                        ON CONFLICT (name) DO UPDATE
+                        SET articles_count = tags.articles_count + 1
                         RETURNING id
                     )
                     INSERT INTO article_tags (article_id, tag_id)
@@ -181,6 +217,7 @@ def add_article(mock_db_session, add_user):
                 [{"name": tag, "article_id": article["id"]} for tag in article["tags"]],
             )
 
+        feed.push_article(mock_db_session.connection(), article["id"])
         return article
 
     return _add_article
@@ -196,8 +233,14 @@ def add_article_favorite(mock_db_session):
 
         stmt = satext(
             """
-            INSERT INTO article_favorites (user_id, article_id)
-            VALUES (:user_id, :article_id)
+            WITH inserted AS (
+                INSERT INTO article_favorites (user_id, article_id)
+                VALUES (:user_id, :article_id)
+                RETURNING article_id
+            )
+            UPDATE articles
+            SET favorites_count = favorites_count + 1
+            WHERE id IN (SELECT article_id FROM inserted)
             """
         )
         mock_db_session.execute(stmt, article_favorite)
@@ -226,8 +269,14 @@ def add_article_comment(mock_db_session, add_user, add_article):
 
         stmt = satext(
             """
-            INSERT INTO article_comments (id, article_id, commenter_user_id, body, created_date, updated_date)
-            VALUES (:id, :article_id, :commenter_user_id, :body, :created_date, :updated_date)
+            WITH inserted AS (
+                INSERT INTO article_comments (id, article_id, commenter_user_id, body, created_date, updated_date)
+                VALUES (:id, :article_id, :commenter_user_id, :body, :created_date, :updated_date)
+                RETURNING article_id
+            )
+            UPDATE articles
+            SET comments_count = comments_count + 1
+            WHERE id IN (SELECT article_id FROM inserted)
             """
         )
         mock_db_session.execute(stmt, article_comment)